@@ -0,0 +1,67 @@
+"""Micro-benchmark for the idea index.
+
+Fills an IdeaIndex with synthetic ideas embedded by HashingEmbedder, then
+times single and batched similarity queries against a plain Python loop
+over the same vectors.
+
+    python benchmarks/bench_idea_index.py --sizes 1000 10000 50000
+"""
+import argparse
+import random
+import tempfile
+import timeit
+
+from common import WORDS
+from main import HashingEmbedder, IdeaIndex
+
+SECTORS = ["AI", "Fintech", "Healthcare", "Climate Tech", "SaaS/B2B", "Consumer Apps"]
+
+def synthetic_ideas(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [
+        {
+            'name': f"idea-{i}",
+            'sector': rng.choice(SECTORS),
+            'text': " ".join(rng.choices(WORDS, k=30)) + f" idea{i}",
+        }
+        for i in range(count)
+    ]
+
+def python_search(vectors, query, k: int):
+    rows = vectors.tolist()
+    query = query.tolist()
+    scores = [sum(a * b for a, b in zip(row, query)) for row in rows]
+    return sorted(range(len(scores)), key=scores.__getitem__, reverse=True)[:k]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000], help="index sizes to measure")
+    parser.add_argument('--batch', type=int, default=32, help="queries per batched search")
+    parser.add_argument('--number', type=int, default=10, help="searches per timing sample")
+    args = parser.parse_args()
+    
+    embedder = HashingEmbedder()
+    for size in args.sizes:
+        ideas = synthetic_ideas(size)
+        with tempfile.TemporaryDirectory() as index_dir:
+            index = IdeaIndex(index_dir, embedder)
+            vectors = embedder.embed([idea['text'] for idea in ideas])
+            index.add([{'name': idea['name'], 'sector': idea['sector'], 'created_at': ""} for idea in ideas], vectors)
+            queries = vectors[:args.batch]
+            
+            single = min(timeit.repeat(lambda: index.search(queries[:1], k=10), number=args.number, repeat=3)) / args.number
+            batched = min(timeit.repeat(lambda: index.search(queries, k=10), number=args.number, repeat=3)) / args.number
+            print(f"\n{size} ideas ({vectors.nbytes / 2 ** 20:.1f} MiB of vectors)")
+            print(f"  {'one query':<34} {single * 1000:8.2f} ms")
+            print(f"  {f'{args.batch} queries, batched':<34} {batched * 1000:8.2f} ms  "
+                  f"({batched * 1000 / args.batch:.3f} ms per query)")
+            if size <= 10000:
+                loop = min(timeit.repeat(lambda: python_search(index.vectors, queries[0], 10), number=1, repeat=3))
+                print(f"  {'one query, Python loop':<34} {loop * 1000:8.2f} ms  {loop / single:5.0f}x slower")
+            
+            start = timeit.default_timer()
+            clusters = index.sector_clusters()
+            print(f"  {'sector clusters':<34} {(timeit.default_timer() - start) * 1000:8.2f} ms  ({len(clusters)} sectors)")
+
+if __name__ == "__main__":
+    main()
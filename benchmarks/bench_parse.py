@@ -0,0 +1,68 @@
+"""Micro-benchmark for listing-page parsing.
+
+Compares the original extraction path (html.parser, full tree, one find_all
+pass per selector) with WebScraper.parse_listing for every available parser
+backend, with and without SoupStrainer.
+
+    python benchmarks/bench_parse.py             # saved pages in benchmarks/fixtures
+    python benchmarks/bench_parse.py --record    # save the live listing pages first
+"""
+import argparse
+import re
+import timeit
+
+from bs4 import BeautifulSoup
+
+from common import record_fixtures, recorded_pages, synthetic_listing
+from main import WebScraper
+
+LEGACY_SELECTORS = [
+    ('article', {'class': re.compile(r'post-block.*')}),
+    ('div', {'class': re.compile(r'post-.*')}),
+    ('article', {}),
+    ('div', {'class': re.compile(r'wp-block.*')}),
+    ('h2', {}),
+    ('h3', {}),
+]
+
+def legacy_parse(content: bytes, limit: int):
+    soup = BeautifulSoup(content, 'html.parser')
+    for tag, attrs in LEGACY_SELECTORS:
+        elements = soup.find_all(tag, attrs, limit=limit)
+        if elements:
+            return tag, elements
+    return '', []
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--record', action='store_true', help="save live listing pages into benchmarks/fixtures")
+    parser.add_argument('--number', type=int, default=20, help="parses per timing sample")
+    parser.add_argument('--limit', type=int, default=20, help="elements requested per page")
+    args = parser.parse_args()
+    
+    if args.record:
+        record_fixtures()
+    
+    backends = ['html.parser']
+    try:
+        import lxml  # noqa: F401
+        backends.append('lxml')
+    except ImportError:
+        print("lxml not installed, only html.parser is measured")
+    
+    pages = recorded_pages() or {'synthetic': synthetic_listing()}
+    for name, content in pages.items():
+        print(f"\n{name} ({len(content) / 1024:.0f} KiB)")
+        baseline = min(timeit.repeat(lambda: legacy_parse(content, args.limit), number=args.number, repeat=3)) / args.number
+        print(f"  {'legacy html.parser, full tree':<34} {baseline * 1000:8.2f} ms")
+        
+        for backend in backends:
+            for strain in (False, True):
+                scraper = WebScraper(use_cache=False, parser=backend, strain=strain)
+                run = lambda: scraper.parse_listing(content, WebScraper.TECHCRUNCH_SELECTORS, args.limit)
+                elapsed = min(timeit.repeat(run, number=args.number, repeat=3)) / args.number
+                label = f"{backend}, {'strained' if strain else 'full tree'}"
+                print(f"  {label:<34} {elapsed * 1000:8.2f} ms  {baseline / elapsed:5.1f}x")
+
+if __name__ == "__main__":
+    main()
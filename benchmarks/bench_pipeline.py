@@ -0,0 +1,204 @@
+"""Offline benchmark of the research pipeline.
+
+Replays listing-page fixtures (recorded with bench_parse.py --record, or
+synthetic) through WebScraper from a local server and answers model calls
+with a fake Ollama server, then times each stage at several article counts:
+
+    parse       WebScraper.parse_listing on every fixture page
+    extraction  WebScraper.scrape_sources against the fixture server
+    format      format_articles_for_analysis
+    pipeline    run_research_pipeline end to end
+
+Results are written as JSON so runs can be compared between versions:
+
+    python benchmarks/bench_pipeline.py --output before.json
+    python benchmarks/bench_pipeline.py --output after.json --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from common import FixtureServer, load_fixture, recorded_pages
+from fake_ollama import FakeOllama
+from main import (ArticleStore, CompetitorAnalyzer, DEDUP_THRESHOLD, FundingAnalyzer, HTML_PARSER,
+                  IdeaGenerator, ResearchJob, WebScraper, format_articles_for_analysis, run_research_pipeline)
+
+def timed(fn, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return {'min_s': min(samples), 'median_s': statistics.median(samples), 'runs': repeat}
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        return ""
+
+def bench_parse(repeat: int):
+    results = []
+    for name, urls in WebScraper.SOURCES.items():
+        selectors = WebScraper.TECHCRUNCH_SELECTORS if name == 'TechCrunch' else WebScraper.VENTURE_BEAT_SELECTORS
+        scraper = WebScraper(use_cache=False)
+        for url in urls:
+            content = load_fixture(url)
+            stats = timed(lambda: scraper.parse_listing(content, selectors, 50), repeat)
+            results.append({'stage': 'parse', 'page': url, 'bytes': len(content), **stats})
+    return results
+
+def bench_extraction(fixtures: FixtureServer, counts, repeat: int):
+    results = []
+    for count in counts:
+        scraper = WebScraper(use_cache=False, sources=fixtures.sources, requests_per_second=None)
+        limits = {'TechCrunch': count, 'VentureBeat': min(count // 2, 5)}
+        found = {}
+        def run():
+            found.update(scraper.scrape_sources(limits, log=lambda message: None))
+        stats = timed(run, repeat)
+        results.append({'stage': 'extraction', 'articles': count,
+                        'extracted': sum(len(a) for a in found.values()), **stats})
+    return results
+
+def bench_format(counts, repeat: int):
+    scraper = WebScraper(use_cache=False)
+    sample = scraper.get_sample_funding_data()
+    results = []
+    for count in counts:
+        articles = [dict(sample[i % len(sample)], link=f"https://example.com/{i}") for i in range(count)]
+        stats = timed(lambda: format_articles_for_analysis(articles), max(repeat, 20))
+        results.append({'stage': 'format', 'articles': count, **stats})
+    return results
+
+def bench_pipeline(fixtures: FixtureServer, fake: FakeOllama, counts, repeat: int, args):
+    from langchain_ollama.llms import OllamaLLM
+    
+    llm = OllamaLLM(model="fake", base_url=fake.base_url, num_ctx=args.context_tokens)
+    results = []
+    for count in counts:
+        with tempfile.TemporaryDirectory() as tmp:
+            article_store = ArticleStore(os.path.join(tmp, "articles.db"))
+            scraper = WebScraper(use_cache=False, store=article_store, sources=fixtures.sources,
+                                 requests_per_second=None)
+            components = dict(
+                scraper=scraper,
+                article_store=article_store,
+                funding_analyzer=FundingAnalyzer(llm, context_tokens=args.context_tokens,
+                                                 max_parallel=args.parallel),
+                idea_generator=IdeaGenerator(llm),
+                competitor_analyzer=CompetitorAnalyzer(llm),
+            )
+            params = {
+                'use_sample_data': False,
+                'num_articles': count,
+                'article_window': "Latest scrape",
+                'dedup_threshold': DEDUP_THRESHOLD,
+                'focus_area': "All Sectors",
+                'additional_context': "",
+                'max_parallel': args.parallel,
+            }
+            jobs = []
+            def run():
+                job = ResearchJob(f"bench{len(jobs)}", params)
+                run_research_pipeline(job, **components)
+                jobs.append(job)
+            before = fake.requests
+            stats = timed(run, repeat)
+            job = jobs[-1]
+            results.append({
+                'stage': 'pipeline',
+                'articles': count,
+                'analyzed': len(job.results.get('articles', [])),
+                'llm_requests': (fake.requests - before) // repeat,
+                'first_token_s': (job.timings.get('market_analysis') or {}).get('first_token'),
+                **stats,
+            })
+    return results
+
+def compare(current, previous_path):
+    with open(previous_path, 'r', encoding='utf-8') as f:
+        previous = json.load(f)
+    
+    def key(result):
+        return (result['stage'], result.get('page') or result.get('articles'))
+    
+    baseline = {key(r): r for r in previous['results']}
+    print(f"\nCompared with {previous_path} ({previous['meta'].get('git_revision') or 'unknown revision'})")
+    for result in current['results']:
+        old = baseline.get(key(result))
+        if old:
+            ratio = result['median_s'] / old['median_s'] if old['median_s'] else float('inf')
+            print(f"  {result['stage']:<11} {str(key(result)[1])[-40:]:<40} "
+                  f"{old['median_s'] * 1000:10.2f} ms -> {result['median_s'] * 1000:10.2f} ms  ({ratio:5.2f}x)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--counts', type=int, nargs='+', default=[5, 10, 25, 50], help="article counts to measure")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--stages', nargs='+', default=['parse', 'extraction', 'format', 'pipeline'])
+    parser.add_argument('--tokens-per-sec', type=float, default=200.0, help="fake model generation speed")
+    parser.add_argument('--prompt-tps', type=float, default=2000.0, help="fake model prompt evaluation speed")
+    parser.add_argument('--load-latency', type=float, default=0.0, help="fake model latency before each response")
+    parser.add_argument('--completion-tokens', type=int, default=120)
+    parser.add_argument('--context-tokens', type=int, default=4096)
+    parser.add_argument('--parallel', type=int, default=2)
+    parser.add_argument('--output', default="bench_results.json")
+    parser.add_argument('--compare', help="earlier results file to compare against")
+    args = parser.parse_args()
+    
+    # Until bench_parse.py --record has been run, every listing page is synthetic
+    fixtures_kind = 'recorded' if recorded_pages() else 'synthetic'
+    print(f"Listing pages: {fixtures_kind}")
+    results = []
+    with FixtureServer(num_articles=max(args.counts) * 2) as fixtures, \
+            FakeOllama(load_latency=args.load_latency, prompt_tps=args.prompt_tps,
+                       tokens_per_sec=args.tokens_per_sec, completion_tokens=args.completion_tokens) as fake:
+        if 'parse' in args.stages:
+            results += bench_parse(args.repeat)
+        if 'extraction' in args.stages:
+            results += bench_extraction(fixtures, args.counts, args.repeat)
+        if 'format' in args.stages:
+            results += bench_format(args.counts, args.repeat)
+        if 'pipeline' in args.stages:
+            results += bench_pipeline(fixtures, fake, args.counts, args.repeat, args)
+    
+    for result in results:
+        label = result.get('page') or f"{result['articles']} articles"
+        print(f"{result['stage']:<11} {label[-45:]:<45} median {result['median_s'] * 1000:10.2f} ms")
+    
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'html_parser': HTML_PARSER,
+            'fixtures': fixtures_kind,
+            'fake_ollama': {
+                'load_latency': args.load_latency,
+                'prompt_tps': args.prompt_tps,
+                'tokens_per_sec': args.tokens_per_sec,
+                'completion_tokens': args.completion_tokens,
+            },
+            'counts': args.counts,
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+    
+    if args.compare:
+        compare(report, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Shared helpers for the offline benchmarks: listing-page fixtures and a local server for them."""
+import glob
+import http.server
+import os
+import random
+import re
+import socketserver
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import WebScraper
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+def fixture_name(url: str) -> str:
+    """File name a listing page URL is recorded under"""
+    return re.sub(r'[^a-z0-9]+', '_', url.split('://', 1)[-1].lower()).strip('_') + ".html"
+
+WORDS = (
+    "platform payments robotics biotech logistics climate carbon insurance lending payroll "
+    "security identity analytics developer tooling inference chips batteries grid freight "
+    "clinical diagnostics genomics retail commerce marketplace creators gaming education "
+    "housing mortgage compliance procurement agents automation data privacy satellites"
+).split()
+
+def synthetic_listing(num_articles: int = 40, filler_blocks: int = 400, seed: str = "") -> bytes:
+    """Homepage-shaped page: article cards buried in navigation and widgets"""
+    rng = random.Random(seed)
+    filler = "".join(
+        f'<div class="widget-{i}"><ul><li><a href="/nav/{i}">Nav {i}</a></li>'
+        f'<li><span>Sponsored {i}</span></li></ul><p>{"lorem ipsum " * 20}</p></div>'
+        for i in range(filler_blocks)
+    )
+    cards = []
+    for i in range(num_articles):
+        company = "".join(rng.choice("bcdfgklmnprstvz") + rng.choice("aeiou") for _ in range(3)).title()
+        topic = " ".join(rng.sample(WORDS, 3))
+        excerpt = " ".join(rng.choice(WORDS) for _ in range(40))
+        cards.append(
+            f'<article class="post-block post-{i}"><h2><a href="/2024/01/{seed}{i}/{company.lower()}">'
+            f'{company} raises ${rng.randint(2, 400)}M Series {rng.choice("ABCD")} for {topic}</a></h2>'
+            f'<p>{company} {excerpt}</p><time datetime="2024-01-{i % 28 + 1:02d}">Jan</time></article>'
+        )
+    return (f"<html><head><script>{'var x = 1;' * 500}</script></head><body>"
+            f"<header>{filler}</header><main>{''.join(cards)}</main><footer>{filler}</footer></body></html>").encode()
+
+def record_fixtures(sources=None):
+    """Save the live listing pages of every source into FIXTURES_DIR"""
+    scraper = WebScraper(use_cache=False)
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    for urls in (sources or WebScraper.SOURCES).values():
+        for url in urls:
+            try:
+                response = scraper.session.get(url, timeout=(5, 15))
+                response.raise_for_status()
+            except Exception as e:
+                print(f"skip {url}: {e}")
+                continue
+            with open(os.path.join(FIXTURES_DIR, fixture_name(url)), 'wb') as f:
+                f.write(response.content)
+            print(f"saved {url} ({len(response.content)} bytes)")
+
+def load_fixture(url: str, num_articles: int = 40) -> bytes:
+    """Recorded page for url, or a synthetic one when it hasn't been recorded"""
+    path = os.path.join(FIXTURES_DIR, fixture_name(url))
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            return f.read()
+    return synthetic_listing(num_articles, seed=fixture_name(url))
+
+def recorded_pages():
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.html"))):
+        with open(path, 'rb') as f:
+            pages[os.path.basename(path)] = f.read()
+    return pages
+
+class FixtureServer:
+    """Serves listing-page fixtures on localhost in place of the real sites"""
+    
+    def __init__(self, sources=None, num_articles: int = 40):
+        self.pages = {}
+        self.local_sources = {}
+        for name, urls in (sources or WebScraper.SOURCES).items():
+            self.local_sources[name] = []
+            for url in urls:
+                path = "/" + fixture_name(url)
+                self.pages[path] = load_fixture(url, num_articles)
+                self.local_sources[name].append(path)
+        
+        pages = self.pages
+        
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = pages.get(self.path.split('?')[0])
+                if body is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, *args):
+                pass
+        
+        self.server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.sources = {name: [base + path for path in paths] for name, paths in self.local_sources.items()}
+    
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+    
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
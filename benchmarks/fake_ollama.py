@@ -0,0 +1,145 @@
+"""Stand-in for Ollama's HTTP API with configurable speed.
+
+Implements /api/generate (streaming and not), /api/tags and /api/version.
+Responses are filler tokens, timed like a real model: a fixed load latency,
+prompt evaluation at prompt_tps and generation at tokens_per_sec. The final
+chunk carries the same count/duration fields Ollama reports.
+
+    python benchmarks/fake_ollama.py --port 11434 --tokens-per-sec 15
+"""
+import argparse
+import http.server
+import json
+import socketserver
+import threading
+import time
+from datetime import datetime, timezone
+
+class FakeOllama:
+    def __init__(self, port: int = 0, load_latency: float = 0.0, prompt_tps: float = 2000.0,
+                 tokens_per_sec: float = 200.0, completion_tokens: int = 120):
+        self.load_latency = load_latency
+        self.prompt_tps = prompt_tps
+        self.tokens_per_sec = tokens_per_sec
+        self.completion_tokens = completion_tokens
+        self.requests = 0
+        fake = self
+        
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            
+            def _json(self, payload, status=200):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def _chunk(self, payload):
+                data = (json.dumps(payload) + "\n").encode()
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+            
+            def do_GET(self):
+                if self.path.startswith('/api/tags'):
+                    self._json({'models': [{'name': 'fake:latest', 'model': 'fake:latest'}]})
+                elif self.path.startswith('/api/version'):
+                    self._json({'version': '0.0.0-fake'})
+                else:
+                    self._json({'error': 'not found'}, 404)
+            
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                request = json.loads(self.rfile.read(length) or b'{}')
+                if not self.path.startswith('/api/generate'):
+                    self._json({'error': 'not found'}, 404)
+                    return
+                fake.requests += 1
+                fake.generate(self, request)
+            
+            def log_message(self, *args):
+                pass
+        
+        self.server = socketserver.ThreadingTCPServer(('127.0.0.1', port), Handler)
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+    
+    def generate(self, handler, request):
+        prompt = request.get('prompt', '')
+        prompt_tokens = len(prompt) // 4 + 1
+        num_predict = (request.get('options') or {}).get('num_predict')
+        completion_tokens = self.completion_tokens
+        if num_predict is not None and num_predict >= 0:
+            completion_tokens = min(num_predict, self.completion_tokens)
+        model = request.get('model', 'fake')
+        
+        start = time.perf_counter()
+        prompt_eval = prompt_tokens / self.prompt_tps
+        time.sleep(self.load_latency + prompt_eval)
+        
+        tokens = [f"token{i} " for i in range(completion_tokens)]
+        stream = request.get('stream', True)
+        if stream:
+            handler.send_response(200)
+            handler.send_header('Content-Type', 'application/x-ndjson')
+            handler.send_header('Transfer-Encoding', 'chunked')
+            handler.end_headers()
+        
+        eval_start = time.perf_counter()
+        for token in tokens:
+            time.sleep(1.0 / self.tokens_per_sec)
+            if stream:
+                handler._chunk({'model': model, 'created_at': self._now(), 'response': token, 'done': False})
+        eval_duration = time.perf_counter() - eval_start
+        
+        final = {
+            'model': model,
+            'created_at': self._now(),
+            'response': '' if stream else ''.join(tokens),
+            'done': True,
+            'done_reason': 'stop',
+            'total_duration': int((time.perf_counter() - start) * 1e9),
+            'load_duration': int(self.load_latency * 1e9),
+            'prompt_eval_count': prompt_tokens,
+            'prompt_eval_duration': int(prompt_eval * 1e9),
+            'eval_count': completion_tokens,
+            'eval_duration': int(eval_duration * 1e9),
+        }
+        if stream:
+            handler._chunk(final)
+            handler.wfile.write(b"0\r\n\r\n")
+        else:
+            handler._json(final)
+    
+    @staticmethod
+    def _now() -> str:
+        return datetime.now(timezone.utc).isoformat()
+    
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+    
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=11434)
+    parser.add_argument('--load-latency', type=float, default=0.0, help="seconds before prompt evaluation starts")
+    parser.add_argument('--prompt-tps', type=float, default=2000.0, help="prompt tokens evaluated per second")
+    parser.add_argument('--tokens-per-sec', type=float, default=200.0, help="completion tokens generated per second")
+    parser.add_argument('--completion-tokens', type=int, default=120)
+    args = parser.parse_args()
+    
+    with FakeOllama(args.port, args.load_latency, args.prompt_tps, args.tokens_per_sec, args.completion_tokens) as fake:
+        print(f"Fake Ollama listening on {fake.base_url}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+if __name__ == "__main__":
+    main()
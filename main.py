@@ -1,36 +1,1002 @@
+import time
+_MODULE_START = time.perf_counter()
+
 import streamlit as st
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+from langchain_ollama import OllamaEmbeddings
 from langchain_ollama.llms import OllamaLLM
 from langchain_core.prompts import PromptTemplate
-from langchain.chains import LLMChain
+from langchain_core.callbacks import BaseCallbackHandler
 import pandas as pd
+import numpy as np
+import argparse
+import contextvars
 import json
-import time
+import os
+import sys
+import hashlib
+import heapq
+import math
+import sqlite3
+import tempfile
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple, Iterator
 import re
-from urllib.parse import urljoin, urlparse
+import random
+import threading
+import traceback
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from urllib.parse import urljoin, urlparse, urlencode, parse_qsl
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
 
-st.set_page_config(
-    page_title="Startup Idea Finder",
-    page_icon="💡",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+FOCUS_AREAS = [
+    "All Sectors", "AI/Machine Learning", "Fintech", "Healthcare", 
+    "E-commerce", "SaaS/B2B", "Consumer Apps", "Climate Tech",
+    "EdTech", "PropTech", "Web3/Crypto", "Gaming", "IoT/Hardware"
+]
+
+ARTICLE_WINDOWS = ["Latest scrape", "New since last run", "Last 7 days", "Last 30 days"]
+
+# Concurrent generations the Ollama server will run; match its OLLAMA_NUM_PARALLEL
+OLLAMA_NUM_PARALLEL = int(os.environ.get("OLLAMA_NUM_PARALLEL", "2"))
+
+# LLM requests that may wait for a generation slot before new ones are refused
+LLM_QUEUE_SIZE = int(os.environ.get("STARTUP_IDEAS_LLM_QUEUE_SIZE", "64"))
+
+# How long Ollama keeps a model loaded after its last request
+OLLAMA_KEEP_ALIVE = os.environ.get("OLLAMA_KEEP_ALIVE", "30m")
+
+# Pipeline stages that can be routed to their own model
+MODEL_STAGES = ('map', 'analysis', 'ideas', 'competition')
+
+def ollama_base_url() -> str:
+    host = os.environ.get("OLLAMA_HOST", "127.0.0.1:11434")
+    return host if "://" in host else f"http://{host}"
+
+def duration_seconds(value: str) -> float:
+    """Seconds in an Ollama keep_alive value such as "30m" or "300"; negative means forever"""
+    value = str(value).strip()
+    units = {'s': 1, 'm': 60, 'h': 3600}
+    if value and value[-1] in units:
+        return float(value[:-1]) * units[value[-1]]
+    return float(value)
+
+class ModelManager:
+    """Process-wide Ollama clients, one per model and context size, warmed up ahead of use.
+    
+    preload() asks the server to load a model from a background thread, so
+    the first real request doesn't pay the cold-load time, and every client
+    passes keep_alive so the model stays resident between runs. The context
+    size is part of the key because Ollama reloads a model whose num_ctx
+    changes.
+    """
+    
+    def __init__(self, base_url: str = None, keep_alive: str = OLLAMA_KEEP_ALIVE):
+        self.base_url = base_url or ollama_base_url()
+        self.keep_alive = keep_alive
+        self._clients = {}
+        self._status = {}
+        self._lock = threading.Lock()
+    
+    def llm(self, model: str, num_ctx: int = None):
+        with self._lock:
+            key = (model, num_ctx)
+            if key not in self._clients:
+                self._clients[key] = OllamaLLM(model=model, num_ctx=num_ctx, keep_alive=self.keep_alive,
+                                               base_url=self.base_url)
+            return self._clients[key]
+    
+    def status(self, model: str, num_ctx: int = None) -> Dict[str, Any]:
+        status = dict(self._status.get((model, num_ctx), {'state': 'cold'}))
+        keep_alive = duration_seconds(self.keep_alive)
+        if status['state'] == 'ready' and keep_alive >= 0 and time.time() - status['at'] > keep_alive:
+            status['state'] = 'cold'
+        return status
+    
+    def preload(self, model: str, num_ctx: int = None) -> bool:
+        """Start loading the model in the background unless it is loaded or loading.
+        
+        A model counts as loaded until keep_alive has passed since it was
+        preloaded; preloading a model the server still holds costs one
+        cheap request.
+        """
+        with self._lock:
+            if self.status(model, num_ctx)['state'] in ('loading', 'ready'):
+                return False
+            self._status[(model, num_ctx)] = {'state': 'loading', 'at': time.time()}
+        threading.Thread(target=self._load, args=(model, num_ctx), name=f"preload-{model}", daemon=True).start()
+        return True
+    
+    def _load(self, model: str, num_ctx: int = None):
+        start = time.perf_counter()
+        try:
+            # A generate request without a prompt only loads the model
+            response = requests.post(f"{self.base_url}/api/generate", json={
+                'model': model,
+                'keep_alive': self.keep_alive,
+                'options': {'num_ctx': num_ctx} if num_ctx else {},
+                'stream': False,
+            }, timeout=(5, 600))
+            response.raise_for_status()
+            status = {'state': 'ready', 'load_s': round(time.perf_counter() - start, 2)}
+        except requests.RequestException as e:
+            status = {'state': 'error', 'error': str(e)}
+        with self._lock:
+            self._status[(model, num_ctx)] = {**status, 'at': time.time()}
 
 @st.cache_resource
-def get_llm(model_name: str = "llama3.2"):
-    """Initialize Ollama LLM with specified model"""
+def get_model_manager() -> ModelManager:
+    return ModelManager()
+
+def get_llm(model_name: str = "llama3.2", num_ctx: int = None):
+    """Ollama client for the model, shared across sessions"""
     try:
-        return OllamaLLM(model=model_name)
+        return get_model_manager().llm(model_name, num_ctx)
     except Exception as e:
         st.error(f"Error initializing Ollama model '{model_name}': {str(e)}")
         return None
 
-class WebScraper:
+def prime_prompt_prefix(llm, prefix: str):
+    """Have Ollama evaluate the start of upcoming prompts, so they reuse its cached context.
+    
+    The request carries the client's model, num_ctx and keep_alive, since a
+    different num_ctx would reload the model and drop the cache. Clients
+    other than OllamaLLM are left alone; failures are recorded and ignored.
+    """
+    if not hasattr(llm, 'base_url'):
+        return
+    with current_tracer().span('prime', model=llm.model, prompt_chars=len(prefix)) as span:
+        try:
+            # Only the prompt evaluation matters, so generate a single token
+            with _llm_scheduler.slot(span):
+                response = requests.post(f"{llm.base_url or ollama_base_url()}/api/generate", json={
+                    'model': llm.model,
+                    'prompt': prefix,
+                    'keep_alive': llm.keep_alive,
+                    'options': {'num_ctx': llm.num_ctx, 'num_predict': 1} if llm.num_ctx else {'num_predict': 1},
+                    'stream': False,
+                }, timeout=(5, 600))
+            response.raise_for_status()
+            info = response.json()
+            span['prompt_tokens'] = info.get('prompt_eval_count', 0)
+            if info.get('prompt_eval_duration'):
+                span['prompt_eval_s'] = round(info['prompt_eval_duration'] / 1e9, 4)
+        except (requests.RequestException, ValueError) as e:
+            span['error'] = str(e)
+
+CACHE_DIR = os.environ.get(
+    "STARTUP_IDEAS_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+)
+
+class Tracer:
+    """Timing spans for one pipeline run.
+    
+    Each span records its wall time plus whatever attributes the caller
+    attaches (bytes downloaded, token counts, ...). The tracer for the
+    current run is found through current_tracer(), so code deep in the
+    scraper or agents can record spans without it being passed down.
+    """
+    
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.spans = []
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+    
+    def record(self, name: str, wall_s: float, **attrs):
+        if not self.enabled:
+            return
+        span = {'name': name, 'wall_s': round(wall_s, 6), 'thread': threading.current_thread().name}
+        span.update(attrs)
+        with self._lock:
+            self.spans.append(span)
+    
+    @contextmanager
+    def span(self, name: str, **attrs):
+        """Time a block; the yielded dict can be filled with attributes as it runs"""
+        start = time.perf_counter()
+        try:
+            yield attrs
+        finally:
+            self.record(name, time.perf_counter() - start, start_s=round(start - self._t0, 6), **attrs)
+    
+    def write_json(self, path: str, **meta):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({**meta, 'summary': summarize_spans(self.spans), 'spans': self.spans}, f, indent=2, default=str)
+
+def summarize_spans(spans: List[Dict]) -> Dict[str, Dict[str, float]]:
+    """Per span name: count, total wall time, bytes and tokens"""
+    totals = {}
+    for span in spans:
+        entry = totals.setdefault(span['name'], {'count': 0, 'wall_s': 0.0, 'bytes': 0,
+                                                 'prompt_tokens': 0, 'completion_tokens': 0})
+        entry['count'] += 1
+        entry['wall_s'] += span['wall_s']
+        for field in ('bytes', 'prompt_tokens', 'completion_tokens'):
+            entry[field] += span.get(field) or 0
+    return totals
+
+class OllamaUsageHandler(BaseCallbackHandler):
+    """Captures the token counts and durations Ollama reports when a generation ends"""
     
     def __init__(self):
+        self.info = {}
+    
+    def on_llm_end(self, response, **kwargs):
+        for generations in response.generations:
+            for generation in generations:
+                self.info.update(generation.generation_info or {})
+    
+    def metrics(self) -> Dict[str, float]:
+        info = self.info
+        metrics = {}
+        if 'prompt_eval_count' in info:
+            metrics['prompt_tokens'] = info['prompt_eval_count']
+        if 'eval_count' in info:
+            metrics['completion_tokens'] = info['eval_count']
+        # Ollama reports durations in nanoseconds
+        if info.get('eval_duration'):
+            metrics['tokens_per_sec'] = round(info.get('eval_count', 0) / (info['eval_duration'] / 1e9), 2)
+        for field in ('prompt_eval_duration', 'load_duration'):
+            if info.get(field):
+                metrics[field.replace('_duration', '_s')] = round(info[field] / 1e9, 4)
+        return metrics
+
+@st.cache_resource
+def get_tracer_context() -> contextvars.ContextVar:
+    # One per process: Streamlit re-executes this module on every rerun, and
+    # jobs started by an earlier rerun must see the same variable
+    return contextvars.ContextVar('tracer', default=Tracer(enabled=False))
+
+_current_tracer = get_tracer_context()
+
+def current_tracer() -> Tracer:
+    return _current_tracer.get()
+
+@contextmanager
+def use_tracer(tracer: Tracer):
+    token = _current_tracer.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _current_tracer.reset(token)
+
+def submit_in_context(executor: ThreadPoolExecutor, fn, *args, **kwargs):
+    """executor.submit that carries the caller's tracer and LLM requester into the worker thread"""
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+class LLMScheduler:
+    """Process-wide gate in front of the Ollama server, shared by every session.
+
+    At most `slots` generations run at once. Waiting requests are served
+    interactive ones first, then round-robin across sessions, so one
+    session's batch of calls can't hold up everyone else's; past max_queue
+    waiting requests, new ones are refused. A request whose model and
+    prompt match a generation already in flight doesn't queue at all: it
+    follows that generation, receiving the same chunks as they arrive.
+    """
+    
+    INTERACTIVE = 0
+    BATCH = 1
+    
+    def __init__(self, slots: int = OLLAMA_NUM_PARALLEL, max_queue: int = LLM_QUEUE_SIZE):
+        self.slots = slots
+        self.max_queue = max_queue
+        self._cond = threading.Condition()
+        self._active = 0
+        self._queued = 0
+        # Per priority, each session's waiting requests in round-robin order
+        self._waiting = [OrderedDict() for _ in (self.INTERACTIVE, self.BATCH)]
+        self._flights = {}
+        self._coalesced = 0
+    
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {'running': self._active, 'waiting': self._queued,
+                    'in_flight': len(self._flights), 'coalesced': self._coalesced}
+    
+    @contextmanager
+    def slot(self, span: Dict = None):
+        """Hold a generation slot for the current requester, waiting for it in turn"""
+        session, priority = current_requester()
+        start = time.perf_counter()
+        with self._cond:
+            if self._queued >= self.max_queue:
+                raise RuntimeError(f"Too many LLM requests are waiting ({self._queued}); try again shortly.")
+            ticket = {'granted': False}
+            self._waiting[priority].setdefault(session, deque()).append(ticket)
+            self._queued += 1
+            self._dispatch()
+            self._cond.wait_for(lambda: ticket['granted'])
+        if span is not None:
+            span['queue_wait_s'] = round(time.perf_counter() - start, 4)
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._dispatch()
+    
+    def _dispatch(self):
+        while self._active < self.slots:
+            queue = next((queue for queue in self._waiting if queue), None)
+            if queue is None:
+                break
+            session, tickets = next(iter(queue.items()))
+            tickets.popleft()['granted'] = True
+            if tickets:
+                queue.move_to_end(session)
+            else:
+                del queue[session]
+            self._active += 1
+            self._queued -= 1
+        self._cond.notify_all()
+    
+    def stream(self, llm, prompt: str, config: Dict = None, span: Dict = None) -> Iterator[str]:
+        """llm.stream(prompt), scheduled, or joined to an identical generation in flight.
+        
+        Nothing is registered until the result is first iterated, so an
+        iterator that is never read can't leave followers waiting on it.
+        """
+        key = (getattr(llm, 'model', type(llm).__name__), getattr(llm, 'num_ctx', None), prompt)
+        with self._cond:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = {'chunks': [], 'done': False, 'error': None, 'followers': 0}
+                leader = True
+            else:
+                flight['followers'] += 1
+                self._coalesced += 1
+                leader = False
+        if span is not None:
+            span['coalesced'] = not leader
+        if leader:
+            yield from self._lead(key, flight, llm, prompt, config, span)
+        else:
+            yield from self._follow(flight)
+    
+    def _lead(self, key, flight: Dict, llm, prompt: str, config: Dict, span: Dict) -> Iterator[str]:
+        error = RuntimeError("The generation was abandoned")
+        try:
+            with self.slot(span):
+                chunks = llm.stream(prompt, config=config)
+                try:
+                    for chunk in chunks:
+                        self._publish(flight, chunk)
+                        yield chunk
+                    error = None
+                except GeneratorExit:
+                    # Our caller stopped reading; finish anyway if others are following
+                    with self._cond:
+                        drain = flight['followers'] > 0
+                        if not drain:
+                            del self._flights[key]
+                    if drain:
+                        for chunk in chunks:
+                            self._publish(flight, chunk)
+                        error = None
+                    raise
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            with self._cond:
+                flight['done'] = True
+                flight['error'] = error
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                self._cond.notify_all()
+    
+    def _publish(self, flight: Dict, chunk: str):
+        with self._cond:
+            flight['chunks'].append(chunk)
+            self._cond.notify_all()
+    
+    def _follow(self, flight: Dict) -> Iterator[str]:
+        sent = 0
+        try:
+            while True:
+                with self._cond:
+                    self._cond.wait_for(lambda: len(flight['chunks']) > sent or flight['done'])
+                    chunks = flight['chunks'][sent:]
+                    if not chunks and flight['done']:
+                        if flight['error'] is not None:
+                            raise flight['error']
+                        return
+                sent += len(chunks)
+                yield from chunks
+        finally:
+            with self._cond:
+                flight['followers'] -= 1
+
+@st.cache_resource
+def get_llm_scheduler() -> LLMScheduler:
+    return LLMScheduler()
+
+@st.cache_resource
+def get_requester_context() -> contextvars.ContextVar:
+    return contextvars.ContextVar('llm_requester', default=('default', LLMScheduler.BATCH))
+
+_llm_scheduler = get_llm_scheduler()
+_current_requester = get_requester_context()
+
+def current_requester() -> Tuple[str, int]:
+    """(session, priority) that LLM requests made here are scheduled under"""
+    return _current_requester.get()
+
+@contextmanager
+def use_requester(session: str, priority: int = LLMScheduler.BATCH):
+    token = _current_requester.set((session, priority))
+    try:
+        yield
+    finally:
+        _current_requester.reset(token)
+
+class MetricsRegistry:
+    """Process-wide totals of recorded spans, exported in Prometheus text format"""
+    
+    def __init__(self, prefix: str = "startup_ideas"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._stage_seconds = {}
+        self._stage_count = {}
+        self._bytes = 0
+        self._tokens = {}
+        self._tokens_per_sec = {}
+    
+    def observe(self, tracer: Tracer):
+        with self._lock:
+            for span in tracer.spans:
+                stage = span['name']
+                self._stage_seconds[stage] = self._stage_seconds.get(stage, 0.0) + span['wall_s']
+                self._stage_count[stage] = self._stage_count.get(stage, 0) + 1
+                self._bytes += span.get('bytes', 0) or 0
+                agent = span.get('agent')
+                if agent:
+                    for kind in ('prompt_tokens', 'completion_tokens'):
+                        key = (agent, kind)
+                        self._tokens[key] = self._tokens.get(key, 0) + (span.get(kind) or 0)
+                    if span.get('tokens_per_sec'):
+                        self._tokens_per_sec[agent] = span['tokens_per_sec']
+    
+    def to_prometheus(self) -> str:
+        p = self.prefix
+        lines = [
+            f"# HELP {p}_stage_seconds Wall time spent per pipeline stage.",
+            f"# TYPE {p}_stage_seconds summary",
+        ]
+        with self._lock:
+            for stage in sorted(self._stage_seconds):
+                lines.append(f'{p}_stage_seconds_sum{{stage="{stage}"}} {self._stage_seconds[stage]:.6f}')
+                lines.append(f'{p}_stage_seconds_count{{stage="{stage}"}} {self._stage_count[stage]}')
+            lines += [
+                f"# HELP {p}_downloaded_bytes_total Bytes of listing and article pages received.",
+                f"# TYPE {p}_downloaded_bytes_total counter",
+                f"{p}_downloaded_bytes_total {self._bytes}",
+                f"# HELP {p}_llm_tokens_total Prompt and completion tokens reported by Ollama.",
+                f"# TYPE {p}_llm_tokens_total counter",
+            ]
+            for (agent, kind), count in sorted(self._tokens.items()):
+                lines.append(f'{p}_llm_tokens_total{{agent="{agent}",kind="{kind.split("_")[0]}"}} {count}')
+            lines += [
+                f"# HELP {p}_llm_tokens_per_second Generation speed of the latest call per agent.",
+                f"# TYPE {p}_llm_tokens_per_second gauge",
+            ]
+            for agent, rate in sorted(self._tokens_per_sec.items()):
+                lines.append(f'{p}_llm_tokens_per_second{{agent="{agent}"}} {rate:.3f}')
+        return "\n".join(lines) + "\n"
+    
+    def write(self, path: str):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+@st.cache_resource
+def get_metrics() -> MetricsRegistry:
+    return MetricsRegistry()
+
+def export_run_metrics(tracer: Tracer, run_id: str, metrics_dir: str = None):
+    """Write a run's spans as JSON and refresh the Prometheus text file"""
+    metrics_dir = metrics_dir or os.path.join(CACHE_DIR, "metrics")
+    os.makedirs(metrics_dir, exist_ok=True)
+    tracer.write_json(os.path.join(metrics_dir, f"spans-{run_id}.json"), run_id=run_id)
+    get_metrics().observe(tracer)
+    get_metrics().write(os.path.join(metrics_dir, "metrics.prom"))
+
+def evict_lru(cache_dir: str, max_bytes: int, suffix: str, companion_suffixes: Tuple[str, ...] = ()):
+    """Delete the least recently used cache files until they fit in max_bytes.
+    
+    Files ending in suffix are sized and ordered by mtime, which readers bump
+    on every hit; companion files sharing their stem are removed with them.
+    """
+    entries = []
+    total = 0
+    for entry in os.scandir(cache_dir):
+        if entry.name.endswith(suffix):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+    
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        stem = path[:-len(suffix)]
+        for victim in (path,) + tuple(stem + companion for companion in companion_suffixes):
+            try:
+                os.remove(victim)
+            except OSError:
+                pass
+        total -= size
+
+class TokenBucket:
+    """Allows rate requests per second on average, with bursts of up to burst"""
+    
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+    
+    def reserve(self) -> float:
+        """Take a token, returning how long the caller must wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            # A negative balance is a queue: each waiter is one token further back
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._blocked_until - now)
+    
+    def block_for(self, seconds: float):
+        """Hold every caller back, e.g. while a server's Retry-After runs"""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+class HostRateLimiter:
+    """One token bucket per host, so a slow or throttling host never holds up the others"""
+    
+    def __init__(self, rate: float = 2.0, burst: int = 4):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}
+        self._lock = threading.Lock()
+    
+    def bucket(self, url: str) -> TokenBucket:
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate, self.burst)
+            return self._buckets[host]
+    
+    def acquire(self, url: str) -> float:
+        """Wait for the host's next slot; returns the seconds waited"""
+        wait = self.bucket(url).reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+def retry_after_seconds(response: requests.Response) -> float:
+    """Delay requested by a Retry-After header (seconds or HTTP date), or None"""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class TransportSession(requests.Session):
+    """requests.Session with sized connection pools, per-host rate limiting and retries.
+    
+    Every attempt waits for a slot from the host's token bucket. Responses
+    with a retryable status (429, 5xx) are retried with jittered exponential
+    backoff, or after the server's Retry-After, which also pauses the other
+    requests to that host. If the wait would exceed max_backoff the response
+    is returned as is.
+    """
+    
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+    
+    def __init__(self, limiter: HostRateLimiter = None, max_retries: int = 3,
+                 backoff: float = 0.5, max_backoff: float = 30.0, pool_maxsize: int = 10):
+        super().__init__()
+        self.limiter = limiter
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        # pool_connections is the number of hosts kept pooled, pool_maxsize the connections per host
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=pool_maxsize)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+    
+    def request(self, method, url, *args, **kwargs):
+        rate_wait = 0.0
+        for attempt in range(self.max_retries + 1):
+            if self.limiter is not None:
+                rate_wait += self.limiter.acquire(url)
+            response = super().request(method, url, *args, **kwargs)
+            if response.status_code not in self.RETRY_STATUSES or attempt == self.max_retries:
+                break
+            
+            delay = retry_after_seconds(response)
+            if delay is None:
+                # Full jitter keeps concurrent retries from arriving in lockstep
+                delay = random.uniform(0, self.backoff * 2 ** attempt)
+            if delay > self.max_backoff:
+                break
+            if self.limiter is not None and response.status_code == 429:
+                self.limiter.bucket(url).block_for(delay)
+            response.close()
+            time.sleep(delay)
+        
+        response.retries = attempt
+        response.rate_wait_s = rate_wait
+        return response
+
+class HTTPCache:
+    """On-disk cache of GET response bodies and their validators"""
+    
+    def __init__(self, cache_dir: str, ttl: float = 900, max_bytes: int = 50 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    def _paths(self, url: str) -> Tuple[str, str]:
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return base + '.body', base + '.json'
+    
+    def _write(self, path: str, data: bytes):
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    
+    def get(self, url: str) -> Tuple[Dict, bytes]:
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None, None
+        
+        # Body mtime doubles as the last-used time for eviction
+        try:
+            os.utime(body_path)
+        except OSError:
+            # Evicted by a concurrent put() since the read; what was read is still valid
+            pass
+        return meta, body
+    
+    def is_fresh(self, meta: Dict) -> bool:
+        return time.time() - meta.get('stored_at', 0) < self.ttl
+    
+    def put(self, url: str, response: requests.Response):
+        body_path, meta_path = self._paths(url)
+        meta = {
+            'url': url,
+            'stored_at': time.time(),
+            'encoding': response.encoding,
+            'headers': dict(response.headers),
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+        }
+        self._write(body_path, response.content)
+        self._write(meta_path, json.dumps(meta).encode('utf-8'))
+        self.evict()
+    
+    def revalidated(self, url: str, meta: Dict, response: requests.Response):
+        """Mark an entry fresh again after a 304 Not Modified"""
+        meta['stored_at'] = time.time()
+        for header, field in (('ETag', 'etag'), ('Last-Modified', 'last_modified')):
+            if response.headers.get(header):
+                meta[field] = response.headers[header]
+        self._write(self._paths(url)[1], json.dumps(meta).encode('utf-8'))
+    
+    def evict(self):
+        with self._lock:
+            evict_lru(self.cache_dir, self.max_bytes, '.body', ('.json',))
+    
+    @staticmethod
+    def build_response(url: str, meta: Dict, body: bytes) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = 'OK'
+        response.url = url
+        response.headers = CaseInsensitiveDict(meta.get('headers', {}))
+        response.encoding = meta.get('encoding')
+        response._content = body
+        response.from_cache = True
+        return response
+
+class CachingSession(TransportSession):
+    """TransportSession that answers GETs from an HTTPCache.
+    
+    Fresh entries are returned without touching the network (or the rate
+    limiter). Stale entries are revalidated with If-None-Match/If-Modified-Since
+    and a 304 is served from disk.
+    """
+    
+    def __init__(self, cache: HTTPCache = None, **transport):
+        super().__init__(**transport)
+        self.cache = cache
+    
+    def request(self, method, url, *args, **kwargs):
+        if self.cache is None or method.upper() != 'GET' or kwargs.get('stream'):
+            return super().request(method, url, *args, **kwargs)
+        
+        meta, body = self.cache.get(url)
+        if meta is not None and self.cache.is_fresh(meta):
+            return HTTPCache.build_response(url, meta, body)
+        
+        if meta is not None:
+            headers = dict(kwargs.pop('headers', None) or {})
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+            kwargs['headers'] = headers
+        
+        response = super().request(method, url, *args, **kwargs)
+        
+        if response.status_code == 304 and meta is not None:
+            self.cache.revalidated(url, meta, response)
+            return HTTPCache.build_response(url, meta, body)
+        
+        if response.status_code == 200:
+            self.cache.put(url, response)
+        
+        return response
+
+TRACKING_PARAMS = ('utm_', 'fbclid', 'gclid', 'mc_cid', 'mc_eid', 'ref', 'guccounter')
+
+def normalize_url(url: str) -> str:
+    """Canonical form of an article URL used as its identity across sources and runs"""
+    parts = urlparse(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parts.query)
+        if not k.lower().startswith(TRACKING_PARAMS)
+    ))
+    path = parts.path.rstrip('/') or '/'
+    return f"{host}{path}" + (f"?{query}" if query else "")
+
+def title_hash(title: str) -> str:
+    """Hash of a title with case, punctuation and spacing ignored"""
+    words = re.findall(r'[a-z0-9]+', title.lower())
+    return hashlib.sha1(' '.join(words).encode('utf-8')).hexdigest()
+
+def merge_articles(lists: List[List[Dict]], limit: int, seen: Tuple[set, set] = None) -> List[Dict]:
+    """First limit articles of lists in order, skipping repeated URLs and titles"""
+    seen_urls, seen_titles = seen or (set(), set())
+    merged = []
+    for articles in lists:
+        for article in articles:
+            if len(merged) >= limit:
+                return merged
+            url_key = normalize_url(article['link'])
+            title_key = title_hash(article['title'])
+            if url_key in seen_urls or title_key in seen_titles:
+                continue
+            seen_urls.add(url_key)
+            seen_titles.add(title_key)
+            merged.append(article)
+    return merged
+
+class ArticleStore:
+    """SQLite index of every scraped article, keyed by normalized URL and title hash"""
+    
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS articles (
+                    url_key TEXT PRIMARY KEY,
+                    title_hash TEXT NOT NULL,
+                    title TEXT NOT NULL,
+                    link TEXT NOT NULL,
+                    excerpt TEXT,
+                    date TEXT,
+                    source TEXT,
+                    first_seen REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_articles_title_hash ON articles(title_hash);
+                CREATE INDEX IF NOT EXISTS idx_articles_first_seen ON articles(first_seen);
+                CREATE TABLE IF NOT EXISTS runs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    started_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS bodies (
+                    url_key TEXT PRIMARY KEY,
+                    body TEXT NOT NULL,
+                    bytes INTEGER,
+                    fetched_at REAL NOT NULL
+                );
+            """)
+    
+    def seen(self, article: Dict, before: float = None) -> bool:
+        """Whether the article is stored, counting only those first seen before `before` if given"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM articles WHERE (url_key = ? OR title_hash = ?) AND first_seen < ? LIMIT 1",
+                (normalize_url(article['link']), title_hash(article['title']),
+                 before if before is not None else math.inf)
+            ).fetchone()
+        return row is not None
+    
+    def add(self, article: Dict) -> bool:
+        """Record an article, returning False if it was already known"""
+        if self.seen(article):
+            return False
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO articles VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (normalize_url(article['link']), title_hash(article['title']), article['title'],
+                 article['link'], article.get('excerpt', ''), article.get('date', ''),
+                 article.get('source', ''), time.time())
+            )
+        return cursor.rowcount == 1
+    
+    def begin_run(self) -> float:
+        """Start a pipeline run; articles first seen after the returned time are new"""
+        started_at = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("INSERT INTO runs (started_at) VALUES (?)", (started_at,))
+        return started_at
+    
+    def articles_since(self, timestamp: float, limit: int = None) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT title, link, excerpt, date, source FROM articles "
+                "WHERE first_seen >= ? ORDER BY first_seen DESC LIMIT ?",
+                (timestamp, limit if limit is not None else -1)
+            ).fetchall()
+        return [dict(row) for row in rows]
+    
+    def recent(self, days: int, limit: int = None) -> List[Dict]:
+        return self.articles_since(time.time() - days * 86400, limit)
+    
+    def body(self, url: str) -> str:
+        """Main text previously extracted from the article page, or None"""
+        with self._lock:
+            row = self._conn.execute("SELECT body FROM bodies WHERE url_key = ?", (normalize_url(url),)).fetchone()
+        return row[0] if row else None
+    
+    def save_body(self, url: str, body: str, size: int = None):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO bodies VALUES (?, ?, ?, ?)",
+                (normalize_url(url), body, size, time.time())
+            )
+
+def get_html_parser() -> str:
+    """Prefer lxml's C parser and fall back to the pure-Python one"""
+    try:
+        import lxml  # noqa: F401
+        return 'lxml'
+    except ImportError:
+        return 'html.parser'
+
+HTML_PARSER = get_html_parser()
+
+# Listing pages are only built into these subtrees; the rest of the page is skipped
+LISTING_TAGS = ['article', 'h1', 'h2', 'h3', 'time']
+LISTING_STRAINER = SoupStrainer(LISTING_TAGS)
+
+def compile_selectors(selectors: List[Tuple[str, str]]) -> List[Tuple[str, Any]]:
+    """Compile (tag, class pattern) pairs once so they can be reused across pages"""
+    return [(tag, re.compile(pattern) if pattern else None) for tag, pattern in selectors]
+
+def select_first_match(soup, selectors: List[Tuple[str, Any]], limit: int, start: int = 0) -> Tuple[int, List]:
+    """Index and elements of the first selector in the cascade, from start, that matches anything.
+    
+    Returns -1 and no elements when none does.
+    """
+    for i, (tag, pattern) in enumerate(selectors[start:], start):
+        elements = soup.find_all(tag, class_=pattern, limit=limit) if pattern else soup.find_all(tag, limit=limit)
+        if elements:
+            return i, elements
+    return -1, []
+
+# Page furniture that never holds the article text
+BOILERPLATE_TAGS = ['script', 'style', 'noscript', 'nav', 'header', 'footer', 'aside', 'form', 'figure', 'svg']
+
+def extract_main_text(content: bytes, parser: str = HTML_PARSER, max_chars: int = 20000) -> str:
+    """Main body text of an article page: the paragraphs of its <article>, or of
+    whichever block holds the most paragraph text when there is none"""
+    soup = BeautifulSoup(content, parser)
+    for element in soup.find_all(BOILERPLATE_TAGS):
+        element.decompose()
+    
+    container = soup.find('article')
+    if container is None:
+        weights = {}
+        for paragraph in soup.find_all('p'):
+            parent = paragraph.parent
+            if parent is not None:
+                weights[id(parent)] = (weights.get(id(parent), (0, parent))[0] + len(paragraph.get_text()), parent)
+        container = max(weights.values(), key=lambda weight: weight[0])[1] if weights else soup
+    
+    # Short paragraphs are mostly captions, bylines and share buttons
+    paragraphs = [
+        ' '.join(paragraph.get_text(' ').split())
+        for paragraph in container.find_all('p')
+    ]
+    text = '\n'.join(paragraph for paragraph in paragraphs if len(paragraph) > 40)
+    return text[:max_chars]
+
+class WebScraper:
+    
+    SOURCES = {
+        'TechCrunch': [
+            "https://techcrunch.com/category/startups/",
+            "https://techcrunch.com/tag/funding/",
+            "https://techcrunch.com/"
+        ],
+        'VentureBeat': [
+            "https://venturebeat.com/category/deals/",
+            "https://venturebeat.com/tag/funding/",
+            "https://venturebeat.com/"
+        ],
+    }
+    
+    TECHCRUNCH_SELECTORS = compile_selectors([
+        ('article', r'post-block.*'),
+        ('div', r'post-.*'),
+        ('article', None),
+        ('div', r'wp-block.*'),
+        ('h2', None),
+        ('h3', None),
+    ])
+    
+    VENTURE_BEAT_SELECTORS = compile_selectors([
+        ('article', None),
+        ('div', r'post.*'),
+        ('h2', None),
+    ])
+    
+    # Listings are newest first, so this many known articles in a row means the rest are old
+    CAUGHT_UP_AFTER = 3
+    
+    # Full-article fetches: concurrent requests per host and bytes read per page
+    BODY_REQUESTS_PER_HOST = 2
+    BODY_MAX_BYTES = 1024 * 1024
+    
+    def __init__(self, max_workers: int = 6, cache_ttl: float = 900,
+                 cache_max_bytes: int = 50 * 1024 * 1024, use_cache: bool = True,
+                 parser: str = HTML_PARSER, strain: bool = True,
+                 store: ArticleStore = None, incremental: bool = False,
+                 sources: Dict[str, List[str]] = None, requests_per_second: float = 2.0):
+        self.max_workers = max_workers
+        self.sources = sources or self.SOURCES
+        self.store = store
+        self.incremental = incremental and store is not None
+        self.parser = parser
+        self.strain = strain
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
@@ -43,207 +1009,409 @@ class WebScraper:
             'Sec-Fetch-Site': 'none',
             'Cache-Control': 'max-age=0',
         }
-        self.session = requests.Session()
+        cache = HTTPCache(os.path.join(CACHE_DIR, "http"), cache_ttl, cache_max_bytes) if use_cache else None
+        # requests_per_second=None turns rate limiting off, e.g. for local fixtures
+        limiter = HostRateLimiter(requests_per_second, burst=4) if requests_per_second else None
+        self.session = CachingSession(cache, limiter=limiter, pool_maxsize=max_workers)
         self.session.headers.update(self.headers)
     
     def test_connection(self, url: str) -> bool:
         try:
             response = self.session.get(url, timeout=5)
             return response.status_code == 200
-        except:
+        except requests.RequestException:
             return False
     
     def scrape_techcrunch_funding(self, num_articles: int = 10) -> List[Dict]:
+        return self.scrape_sources({'TechCrunch': num_articles})['TechCrunch']
+    
+    def scrape_venture_beat_funding(self, num_articles: int = 5) -> List[Dict]:
+        return self.scrape_sources({'VentureBeat': num_articles})['VentureBeat']
+    
+    def scrape_sources(self, limits: Dict[str, int], log=None) -> Dict[str, List[Dict]]:
+        """Scrape several sources at once.
+        
+        Every candidate URL of every source is requested concurrently. Each
+        URL's articles are buffered and merged in the configured URL order, so
+        earlier URLs keep priority over fallbacks and the result doesn't depend
+        on which request finished first. Once the URLs up to some fallback have
+        finished and hold enough articles, the remaining fallbacks are
+        cancelled, so wall-clock time stays close to the slowest needed URL
+        instead of the sum of every timeout.
+        
+        Articles are deduplicated across sources by normalized URL and title
+        hash and recorded in the article store when one is attached. In
+        incremental mode a source also stops once every one of its listings
+        has reached articles that were stored before this scrape started.
+        
+        Progress messages are passed to log, which must be safe to call from
+        the thread running this method; without one they are discarded.
+        """
+        log = log or (lambda message: None)
+        url_scrapers = {
+            'TechCrunch': self._scrape_techcrunch_url,
+            'VentureBeat': self._scrape_venture_beat_url,
+        }
+        # Articles this scrape stores itself must not count as previously seen
+        started_at = time.time()
+        pages = {name: {} for name in limits}
+        done = {name: threading.Event() for name in limits}
+        futures = {}
+        
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            for name, num_articles in limits.items():
+                for url in self.sources[name]:
+                    future = submit_in_context(executor, url_scrapers[name], url, num_articles, done[name],
+                                               started_at)
+                    futures[future] = (name, url)
+            
+            for future in as_completed(futures):
+                name, url = futures[future]
+                if future.cancelled() or done[name].is_set():
+                    continue
+                
+                try:
+                    articles, messages, _ = future.result()
+                except Exception as e:
+                    articles, messages = [], [f"Error scraping {name} {url}: {str(e)}"]
+                
+                for message in messages:
+                    log(message)
+                pages[name][url] = articles
+                
+                # Later fallbacks can only be dropped once every URL ahead of them has finished
+                finished = []
+                for source_url in self.sources[name]:
+                    if source_url not in pages[name]:
+                        break
+                    finished.append(pages[name][source_url])
+                if len(merge_articles(finished, limits[name])) >= limits[name]:
+                    done[name].set()
+                    for other, (other_name, _) in futures.items():
+                        if other_name == name:
+                            other.cancel()
+                    
+                    if all(event.is_set() for event in done.values()):
+                        break
+        finally:
+            # Fallback URLs still in flight are abandoned rather than awaited
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        results = {}
+        seen = (set(), set())
+        for name in limits:
+            results[name] = merge_articles([pages[name].get(url, []) for url in self.sources[name]],
+                                           limits[name], seen)
+            if self.store is not None:
+                for article in results[name]:
+                    self.store.add(article)
+            if results[name]:
+                log(f"successfully scraped {len(results[name])} articles from {name}")
+        
+        return results
+    
+    def parse_listing(self, content: bytes, selectors: List[Tuple[str, Any]], limit: int) -> Tuple[str, List]:
+        """Parse a listing page and return the elements of the first matching selector"""
+        if not self.strain:
+            i, elements = select_first_match(BeautifulSoup(content, self.parser), selectors, limit)
+            return (selectors[i][0] if elements else ''), elements
+        
+        i, elements = select_first_match(BeautifulSoup(content, self.parser, parse_only=LISTING_STRAINER),
+                                         selectors, limit)
+        # The strained tree lacks e.g. <div> cards outside an <article>, so it can only be trusted
+        # for selectors before the first one on a tag it doesn't keep
+        unstrained = next((j for j, (tag, _) in enumerate(selectors) if tag not in LISTING_TAGS), len(selectors))
+        if not elements or i >= unstrained:
+            i, elements = select_first_match(BeautifulSoup(content, self.parser), selectors, limit, unstrained)
+        
+        return (selectors[i][0] if elements else ''), elements
+    
+    def _scrape_techcrunch_url(self, url: str, num_articles: int, cancelled: threading.Event,
+                               seen_before: float = None) -> Tuple[List[Dict], List[str], bool]:
         articles = []
+        log = [f"Trying to scrape: {url}"]
         
-        urls_to_try = [
-            "https://techcrunch.com/category/startups/",
-            "https://techcrunch.com/tag/funding/",
-            "https://techcrunch.com/"
-        ]
+        response = self._fetch(url, 'TechCrunch')
+        
+        if getattr(response, 'from_cache', False):
+            log.append(f"Using cached copy of {url}")
+        
+        if cancelled.is_set():
+            return articles, log, False
+        
+        with current_tracer().span('parse', source='TechCrunch', url=url) as span:
+            tag, elements = self.parse_listing(response.content, self.TECHCRUNCH_SELECTORS, num_articles * 2)
+            span['elements'] = len(elements)
+        if elements:
+            log.append(f"Found {len(elements)} {tag} elements")
+        
+        if not elements:
+            log.append(f"No elements found with any selector on {url}")
+            return articles, log, False
         
-        for url in urls_to_try:
+        with current_tracer().span('filter', source='TechCrunch', url=url) as span:
+            articles, caught_up = self._extract_techcrunch_articles(url, elements, num_articles, log,
+                                                                  seen_before)
+            span['articles'] = len(articles)
+        
+        if not articles and not caught_up:
+            log.append(f"No funding articles found on {url}")
+        
+        return articles, log, caught_up
+    
+    def _extract_techcrunch_articles(self, url: str, elements: List, num_articles: int,
+                                     log: List[str], seen_before: float = None) -> Tuple[List[Dict], bool]:
+        articles = []
+        links = set()
+        seen_in_a_row = 0
+        
+        for element in elements:
+            if len(articles) >= num_articles:
+                break
+            
             try:
-                st.write(f"Trying to scrape: {url}")
+                title_elem = None
+                link_elem = None
+                
+                # Strategy 1 direct h2/h3 with link
+                if element.name in ['h2', 'h3']:
+                    title_elem = element
+                    link_elem = element.find('a')
+                else:
+                    # Strategy 2 find h2/h3 inside element
+                    title_elem = element.find(['h2', 'h3'])
+                    if title_elem:
+                        link_elem = title_elem.find('a')
+                    else:
+                        # Strategy 3 find any link
+                        link_elem = element.find('a')
+                        if link_elem:
+                            title_elem = link_elem.parent
                 
-                if not self.test_connection(url):
-                    st.write(f"Cannot connect to {url}")
+                if not title_elem or not link_elem:
                     continue
                 
-                response = self.session.get(url, timeout=15)
-                response.raise_for_status()
+                title = title_elem.get_text().strip()
+                link = link_elem.get('href', '')
+                
+                if not title or not link:
+                    continue
                 
-                soup = BeautifulSoup(response.content, 'html.parser')
+                if link.startswith('/'):
+                    link = urljoin(url, link)
                 
-                selectors_to_try = [
-                    ('article', {'class': re.compile(r'post-block.*')}),
-                    ('div', {'class': re.compile(r'post-.*')}),
-                    ('article', {}),
-                    ('div', {'class': re.compile(r'wp-block.*')}),
-                    ('h2', {}),
-                    ('h3', {}),
+                funding_keywords = [
+                    'raises', 'funding', 'series', 'million', 'billion', 
+                    'investment', 'venture', 'seed', 'round', 'capital',
+                    'valuation', 'startup', 'vc', 'investor'
                 ]
                 
-                for tag, attrs in selectors_to_try:
-                    elements = soup.find_all(tag, attrs, limit=num_articles * 2)
-                    
-                    if elements:
-                        st.write(f"Found {len(elements)} {tag} elements")
-                        break
+                if not any(keyword in title.lower() for keyword in funding_keywords):
+                    continue
+                
+                excerpt = ""
+                excerpt_elem = element.find('p') or element.find('div', string=True)
+                if excerpt_elem:
+                    excerpt = excerpt_elem.get_text().strip()[:200] + "..."
                 
-                if not elements:
-                    st.write(f"No elements found with any selector on {url}")
+                date = ""
+                date_elem = element.find('time')
+                if date_elem:
+                    date = date_elem.get('datetime', '') or date_elem.get_text().strip()
+                
+                article_data = {
+                    'title': title,
+                    'link': link,
+                    'excerpt': excerpt,
+                    'date': date,
+                    'source': 'TechCrunch'
+                }
+                
+                if self._already_seen(article_data, seen_before):
+                    seen_in_a_row += 1
+                    if seen_in_a_row >= self.CAUGHT_UP_AFTER:
+                        log.append(f"Caught up with previously seen articles on {url}")
+                        return articles, True
                     continue
+                seen_in_a_row = 0
                 
-                for element in elements:
-                    if len(articles) >= num_articles:
-                        break
-                    
-                    try:
-                        title_elem = None
-                        link_elem = None
-                        
-                        # Strategy 1 direct h2/h3 with link
-                        if element.name in ['h2', 'h3']:
-                            title_elem = element
-                            link_elem = element.find('a')
-                        else:
-                            # Strategy 2 find h2/h3 inside element
-                            title_elem = element.find(['h2', 'h3'])
-                            if title_elem:
-                                link_elem = title_elem.find('a')
-                            else:
-                                # Strategy 3 find any link
-                                link_elem = element.find('a')
-                                if link_elem:
-                                    title_elem = link_elem.parent
-                        
-                        if not title_elem or not link_elem:
-                            continue
-                        
-                        title = title_elem.get_text().strip()
-                        link = link_elem.get('href', '')
-                        
-                        if not title or not link:
-                            continue
-                        
-                        if link.startswith('/'):
-                            link = urljoin(url, link)
-                        
-                        funding_keywords = [
-                            'raises', 'funding', 'series', 'million', 'billion', 
-                            'investment', 'venture', 'seed', 'round', 'capital',
-                            'valuation', 'startup', 'vc', 'investor'
-                        ]
-                        
-                        if not any(keyword in title.lower() for keyword in funding_keywords):
-                            continue
-                        
-                        excerpt = ""
-                        excerpt_elem = element.find('p') or element.find('div', string=True)
-                        if excerpt_elem:
-                            excerpt = excerpt_elem.get_text().strip()[:200] + "..."
-                        
-                        date = ""
-                        date_elem = element.find('time')
-                        if date_elem:
-                            date = date_elem.get('datetime', '') or date_elem.get_text().strip()
-                        
-                        article_data = {
-                            'title': title,
-                            'link': link,
-                            'excerpt': excerpt,
-                            'date': date,
-                            'source': 'TechCrunch'
-                        }
-                        
-                        if not any(a['link'] == link for a in articles):
-                            articles.append(article_data)
-                            st.write(f"Added: {title[:50]}...")
-                        
-                    except Exception as e:
-                        continue
+                if link not in links:
+                    links.add(link)
+                    articles.append(article_data)
+                    log.append(f"Added: {title[:50]}...")
                 
-                if articles:
-                    st.success(f"successfully scraped {len(articles)} articles from TechCrunch")
-                    break
-                else:
-                    st.write(f"No funding articles found on {url}")
-            
             except Exception as e:
-                st.write(f"Error scraping {url}: {str(e)}")
                 continue
         
-        return articles
+        return articles, False
     
-    def scrape_venture_beat_funding(self, num_articles: int = 5) -> List[Dict]:
+    def _scrape_venture_beat_url(self, url: str, num_articles: int, cancelled: threading.Event,
+                                 seen_before: float = None) -> Tuple[List[Dict], List[str], bool]:
         articles = []
+        log = [f"Trying VentureBeat: {url}"]
         
-        urls_to_try = [
-            "https://venturebeat.com/category/deals/",
-            "https://venturebeat.com/tag/funding/",
-            "https://venturebeat.com/"
-        ]
+        response = self._fetch(url, 'VentureBeat')
+        
+        if getattr(response, 'from_cache', False):
+            log.append(f"Using cached copy of {url}")
+        
+        if cancelled.is_set():
+            return articles, log, False
+        
+        with current_tracer().span('parse', source='VentureBeat', url=url) as span:
+            _, elements = self.parse_listing(response.content, self.VENTURE_BEAT_SELECTORS, num_articles * 2)
+            span['elements'] = len(elements)
+        
+        with current_tracer().span('filter', source='VentureBeat', url=url) as span:
+            articles, caught_up = self._extract_venture_beat_articles(url, elements, num_articles, log,
+                                                                    seen_before)
+            span['articles'] = len(articles)
+        
+        return articles, log, caught_up
+    
+    def _extract_venture_beat_articles(self, url: str, elements: List, num_articles: int,
+                                       log: List[str], seen_before: float = None) -> Tuple[List[Dict], bool]:
+        articles = []
+        seen_in_a_row = 0
         
-        for url in urls_to_try:
+        for element in elements:
+            if len(articles) >= num_articles:
+                break
+            
             try:
-                st.write(f"Trying VentureBeat: {url}")
+                title_elem = element.find(['h2', 'h3', 'h1'])
+                if not title_elem:
+                    continue
                 
-                response = self.session.get(url, timeout=15)
-                response.raise_for_status()
+                link_elem = title_elem.find('a') or element.find('a')
+                if not link_elem:
+                    continue
                 
-                soup = BeautifulSoup(response.content, 'html.parser')
+                title = title_elem.get_text().strip()
+                link = link_elem.get('href', '')
                 
-                elements = (
-                    soup.find_all('article', limit=num_articles * 2) or
-                    soup.find_all('div', class_=re.compile(r'post.*'), limit=num_articles * 2) or
-                    soup.find_all('h2', limit=num_articles * 2)
-                )
+                if link.startswith('/'):
+                    link = urljoin(url, link)
                 
-                for element in elements:
-                    if len(articles) >= num_articles:
-                        break
+                funding_keywords = ['funding', 'raises', 'investment', 'series', 'million', 'startup']
+                if any(keyword in title.lower() for keyword in funding_keywords):
+                    excerpt_elem = element.find('p')
+                    excerpt = excerpt_elem.get_text().strip()[:200] + "..." if excerpt_elem else ""
                     
-                    try:
-                        title_elem = element.find(['h2', 'h3', 'h1'])
-                        if not title_elem:
-                            continue
-                        
-                        link_elem = title_elem.find('a') or element.find('a')
-                        if not link_elem:
-                            continue
-                        
-                        title = title_elem.get_text().strip()
-                        link = link_elem.get('href', '')
-                        
-                        if link.startswith('/'):
-                            link = urljoin(url, link)
-                        
-                        funding_keywords = ['funding', 'raises', 'investment', 'series', 'million', 'startup']
-                        if any(keyword in title.lower() for keyword in funding_keywords):
-                            excerpt_elem = element.find('p')
-                            excerpt = excerpt_elem.get_text().strip()[:200] + "..." if excerpt_elem else ""
-                            
-                            articles.append({
-                                'title': title,
-                                'link': link,
-                                'excerpt': excerpt,
-                                'date': "",
-                                'source': 'VentureBeat'
-                            })
-                            st.write(f"added VentureBeat: {title[:50]}...")
+                    article_data = {
+                        'title': title,
+                        'link': link,
+                        'excerpt': excerpt,
+                        'date': "",
+                        'source': 'VentureBeat'
+                    }
                     
-                    except Exception as e:
+                    if self._already_seen(article_data, seen_before):
+                        seen_in_a_row += 1
+                        if seen_in_a_row >= self.CAUGHT_UP_AFTER:
+                            log.append(f"Caught up with previously seen VentureBeat articles on {url}")
+                            return articles, True
                         continue
-                
-                if articles:
-                    break
+                    seen_in_a_row = 0
+                    
+                    articles.append(article_data)
+                    log.append(f"added VentureBeat: {title[:50]}...")
             
             except Exception as e:
-                st.write(f"Error scraping VentureBeat {url}: {str(e)}")
                 continue
         
-        return articles
+        return articles, False
+    
+    def _fetch(self, url: str, source: str) -> requests.Response:
+        with current_tracer().span('fetch', source=source, url=url) as span:
+            # Connect timeout replaces the separate test_connection() round trip
+            response = self.session.get(url, timeout=(5, 15))
+            span['status'] = response.status_code
+            span['bytes'] = len(response.content)
+            span['from_cache'] = getattr(response, 'from_cache', False)
+            span['retries'] = getattr(response, 'retries', 0)
+            span['rate_wait_s'] = round(getattr(response, 'rate_wait_s', 0.0), 4)
+        response.raise_for_status()
+        return response
+    
+    def fetch_bodies(self, articles: List[Dict], log=None) -> List[Dict]:
+        """Add the main text of each article's page as 'body'.
+        
+        Pages are fetched concurrently, at most BODY_REQUESTS_PER_HOST at a
+        time per host, and each download stops after BODY_MAX_BYTES. Text
+        extracted earlier is taken from the article store. Articles whose
+        page can't be fetched keep just their excerpt.
+        """
+        log = log or (lambda message: None)
+        enriched = list(articles)
+        pending = {}
+        for i, article in enumerate(articles):
+            if not article['link'].startswith('http'):
+                continue
+            body = self.store.body(article['link']) if self.store is not None else None
+            if body is None:
+                pending.setdefault(urlparse(article['link']).netloc, deque()).append(i)
+            elif body:
+                enriched[i] = {**article, 'body': body}
+        
+        def enrich(article: Dict) -> Dict:
+            body, size = self._fetch_body(article['link'])
+            if self.store is not None:
+                self.store.save_body(article['link'], body, size)
+            return {**article, 'body': body} if body else article
+        
+        # A host's next page is only submitted when one of its requests finishes, so pool
+        # threads never sit waiting on a busy host while other hosts' pages are queued
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {}
+            
+            def submit_next(host: str):
+                if pending[host]:
+                    i = pending[host].popleft()
+                    futures[submit_in_context(executor, enrich, articles[i])] = (i, host)
+            
+            for host in pending:
+                for _ in range(self.BODY_REQUESTS_PER_HOST):
+                    submit_next(host)
+            while futures:
+                finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    i, host = futures.pop(future)
+                    submit_next(host)
+                    try:
+                        enriched[i] = future.result()
+                    except Exception as e:
+                        log(f"Could not fetch full text of {articles[i]['link']}: {str(e)}")
+        
+        log(f"Fetched full text for {sum(1 for article in enriched if article.get('body'))} of {len(articles)} articles")
+        return enriched
+    
+    def _fetch_body(self, url: str) -> Tuple[str, int]:
+        """Stream an article page up to BODY_MAX_BYTES and return its main text and the bytes read"""
+        with current_tracer().span('body_fetch', url=url) as span:
+            # Plain gzip so the byte cap applies to what we decode here
+            headers = {'Accept-Encoding': 'gzip, deflate'}
+            with self.session.get(url, headers=headers, timeout=(5, 15), stream=True) as response:
+                span['status'] = response.status_code
+                span['retries'] = response.retries
+                span['rate_wait_s'] = round(response.rate_wait_s, 4)
+                response.raise_for_status()
+                chunks = []
+                size = 0
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size >= self.BODY_MAX_BYTES:
+                        span['truncated'] = True
+                        break
+            span['bytes'] = size
+            body = extract_main_text(b''.join(chunks)[:self.BODY_MAX_BYTES], self.parser)
+            span['chars'] = len(body)
+        return body, size
+    
+    def _already_seen(self, article: Dict, before: float = None) -> bool:
+        return self.incremental and self.store.seen(article, before)
     
     def get_sample_funding_data(self) -> List[Dict]:
         sample_articles = [
@@ -285,19 +1453,163 @@ class WebScraper:
         ]
         return sample_articles
 
-class FundingAnalyzer:
-    """AI agent for analyzing funding trends and extracting insights"""
+class LLMCache:
+    """Content-addressed on-disk cache of agent results.
+    
+    Entries are keyed by model name, prompt template hash and the exact
+    inputs, so any change to one of them is a miss.
+    """
+    
+    def __init__(self, cache_dir: str, ttl: float = 7 * 86400, max_bytes: int = 20 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    @staticmethod
+    def make_key(model: str, template: str, inputs: Dict[str, str]) -> str:
+        payload = json.dumps({
+            'model': model,
+            'template': hashlib.sha256(template.encode('utf-8')).hexdigest(),
+            'inputs': inputs,
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + '.json')
+    
+    def get(self, key: str) -> str:
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        if time.time() - entry.get('stored_at', 0) >= self.ttl:
+            return None
+        
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry['result']
+    
+    def put(self, key: str, result: str):
+        data = json.dumps({'stored_at': time.time(), 'result': result}).encode('utf-8')
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, self._path(key))
+        with self._lock:
+            evict_lru(self.cache_dir, self.max_bytes, '.json')
+
+class LLMAgent:
+    """Base for the AI agents: runs the prompt through the LLM, consulting the result cache first"""
     
-    def __init__(self, llm):
+    def __init__(self, llm, prompt: PromptTemplate, cache: LLMCache = None, bypass_cache: bool = False):
         self.llm = llm
-        self.prompt = PromptTemplate(
+        self.prompt = prompt
+        self.cache = cache
+        self.bypass_cache = bypass_cache
+    
+    @property
+    def model_name(self) -> str:
+        return getattr(self.llm, 'model', type(self.llm).__name__)
+    
+    def run(self, **inputs) -> str:
+        return "".join(self.stream(**inputs))
+    
+    def stream(self, **inputs) -> Iterator[str]:
+        return self._stream(self.prompt, inputs)
+    
+    def _stream(self, prompt: PromptTemplate, inputs: Dict[str, str], step: str = "main",
+                llm=None) -> Iterator[str]:
+        """Yield the model output as it is generated; a cached result arrives as one chunk.
+        
+        llm overrides the agent's model for this call.
+        """
+        llm = llm or self.llm
+        model_name = getattr(llm, 'model', type(llm).__name__)
+        with current_tracer().span('llm', agent=type(self).__name__, step=step, model=model_name) as span:
+            key = None
+            if self.cache is not None:
+                key = LLMCache.make_key(model_name, prompt.template, inputs)
+                if not self.bypass_cache:
+                    cached = self.cache.get(key)
+                    if cached is not None:
+                        span['cached'] = True
+                        yield cached
+                        return
+            
+            text = prompt.format(**inputs)
+            span['prompt_chars'] = len(text)
+            usage = OllamaUsageHandler()
+            start = time.perf_counter()
+            chunks = []
+            for chunk in _llm_scheduler.stream(llm, text, config={'callbacks': [usage]}, span=span):
+                if not chunks:
+                    span['first_token_s'] = round(time.perf_counter() - start, 4)
+                chunks.append(chunk)
+                yield chunk
+            span.update(usage.metrics())
+            
+            if key is not None:
+                self.cache.put(key, "".join(chunks))
+
+# Opening shared by every prompt over the run's articles. Ollama reuses the
+# evaluated context of a prompt that starts the same way as an earlier one,
+# so the articles are processed once per run rather than once per call; the
+# task-specific part of each prompt must therefore come after them.
+ARTICLE_PROMPT_PREFIX = """You are an expert startup and venture capital analyst. Use the recent funding news below to complete the task that follows it.
+
+FUNDING FIGURES (extracted from the articles; use these for amounts, counts and totals rather than recounting):
+{funding_table}
+
+FUNDING NEWS ARTICLES:
+{funding_news}
+
+"""
+
+# Heading of each condensed chunk once article_context() has map-reduced the articles
+ARTICLE_GROUP_HEADER = "SUMMARY OF ARTICLE GROUP"
+
+class FundingAnalyzer(LLMAgent):
+    """AI agent for analyzing funding trends and extracting insights.
+    
+    Article sets that don't fit the model's context window are map-reduced:
+    chunks of articles are condensed in parallel, then the usual analysis
+    runs over the condensed facts.
+    """
+    
+    # Tokens kept free in the context window for the model's answer
+    OUTPUT_RESERVE = 1024
+    # Tokens kept for the longest task that follows the shared article prefix
+    # (a competitor analysis with its idea and relevant articles), so every prompt built on it fits
+    TASK_RESERVE = 1024
+    
+    def __init__(self, llm, cache: LLMCache = None, bypass_cache: bool = False,
+                 context_tokens: int = 4096, max_parallel: int = OLLAMA_NUM_PARALLEL, map_llm=None):
+        # Condensing chunks is simple extraction, so it can run on a smaller, faster model
+        self.map_llm = map_llm or llm
+        self.context_tokens = context_tokens
+        self.max_parallel = max_parallel
+        self.map_prompt = PromptTemplate(
             input_variables=["funding_news"],
-            template="""You are an expert startup and venture capital analyst. Analyze the following funding news articles and provide insights.
+            template="""You are a venture capital research assistant. Condense the following funding news articles into a compact list of facts.
 
 FUNDING NEWS ARTICLES:
 {funding_news}
 
-Please provide a comprehensive analysis including:
+Amounts, rounds and sectors are tabulated separately, so for every article write exactly one line in this form:
+- Company | Investors | What the company does | Source link
+
+Write "unknown" for anything the article does not state. Do not add commentary."""
+        )
+        prompt = PromptTemplate(
+            input_variables=["funding_table", "funding_news"],
+            template=ARTICLE_PROMPT_PREFIX + """TASK: Analyze the funding news and provide a comprehensive analysis including:
 
 **1. TOP FUNDED SECTORS:**
 - Which industries/sectors are getting the most funding
@@ -325,131 +1637,1804 @@ Please provide a comprehensive analysis including:
 
 Format your response with clear headers and bullet points. Be specific and cite examples from the articles when possible."""
         )
-        self.chain = LLMChain(llm=self.llm, prompt=self.prompt)
+        super().__init__(llm, prompt, cache, bypass_cache)
+    
+    def analyze(self, funding_news: str, funding_table: str = "") -> str:
+        return self.run(funding_news=funding_news, funding_table=funding_table or "not available")
+    
+    def analyze_stream(self, funding_news: str, funding_table: str = "") -> Iterator[str]:
+        return self.stream(funding_news=funding_news, funding_table=funding_table or "not available")
+    
+    def prompt_budget(self, prompt: PromptTemplate) -> int:
+        """Tokens available for article text in one call with the given prompt"""
+        return self.context_tokens - estimate_tokens(prompt.template) - self.OUTPUT_RESERVE
     
-    def analyze(self, funding_news: str) -> str:
-        return self.chain.run(funding_news=funding_news)
+    def article_context(self, articles: List[Dict], on_progress=None, funding_table: str = "") -> str:
+        """The articles as they go into ARTICLE_PROMPT_PREFIX, condensed until they fit.
+        
+        The budget leaves room for any task after the prefix, so the result
+        can be shared by the market analysis and every competitor analysis.
+        """
+        with current_tracer().span('prompt_build', agent=type(self).__name__, articles=len(articles)):
+            blocks = [format_article(i, article) for i, article in enumerate(articles, 1)]
+        budget = (self.context_tokens - estimate_tokens(ARTICLE_PROMPT_PREFIX + funding_table)
+                  - self.TASK_RESERVE - self.OUTPUT_RESERVE)
+        
+        # Condensed summaries can still overflow for very large sets, so repeat
+        while len(blocks) > 1 and estimate_tokens("".join(blocks)) > budget:
+            with current_tracer().span('prompt_build', agent=type(self).__name__, step="chunk") as span:
+                chunks = chunk_texts(blocks, self.prompt_budget(self.map_prompt))
+                span['chunks'] = len(chunks)
+            if len(chunks) >= len(blocks):
+                break
+            blocks = self._summarize_chunks(chunks, on_progress)
+        
+        return "".join(blocks)
+    
+    def _summarize_chunk(self, chunk: List[str]) -> str:
+        return "".join(self._stream(self.map_prompt, {'funding_news': "".join(chunk)}, step="map",
+                                    llm=self.map_llm))
+    
+    def _summarize_chunks(self, chunks: List[List[str]], on_progress=None) -> List[str]:
+        summaries = [None] * len(chunks)
+        with ThreadPoolExecutor(max_workers=self.max_parallel) as executor:
+            futures = {
+                submit_in_context(executor, self._summarize_chunk, chunk): i
+                for i, chunk in enumerate(chunks)
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                summaries[futures[future]] = future.result()
+                if on_progress:
+                    on_progress(done, len(chunks))
+        
+        return [
+            f"\n{ARTICLE_GROUP_HEADER} {i}:\n{summary.strip()}\n\n---\n"
+            for i, summary in enumerate(summaries, 1)
+        ]
 
-class IdeaGenerator:
+class IdeaGenerator(LLMAgent):
     """AI agent for generating startup ideas based on funding trends"""
     
-    def __init__(self, llm):
-        self.llm = llm
-        self.prompt = PromptTemplate(
+    def __init__(self, llm, cache: LLMCache = None, bypass_cache: bool = False):
+        prompt = PromptTemplate(
             input_variables=["market_analysis", "focus_area", "additional_context"],
             template="""You are a creative startup idea generator and business strategist. Based on the market analysis and trends, generate innovative startup ideas.
 
 MARKET ANALYSIS:
 {market_analysis}
 
-FOCUS AREA: {focus_area}
+FOCUS AREA: {focus_area}
+
+ADDITIONAL CONTEXT: {additional_context}
+
+Generate 5-7 innovative startup ideas that could attract funding based on current trends. For each idea provide:
+
+**IDEA NAME:** [Creative name]
+**SECTOR:** [Industry/Category]
+**PROBLEM:** [What problem it solves]
+**SOLUTION:** [How it works]
+**TARGET MARKET:** [Who would use it]
+**BUSINESS MODEL:** [How it makes money]
+**FUNDING POTENTIAL:** [Why investors would be interested]
+**COMPETITIVE ADVANTAGE:** [What makes it unique]
+**MVP SUGGESTION:** [How to start small]
+
+**ADDITIONAL CONSIDERATIONS:**
+- Focus on ideas that align with current funding trends
+- Consider emerging technologies (AI, blockchain, IoT, etc.)
+- Think about underserved markets
+- Consider B2B vs B2C opportunities
+- Factor in scalability and market size
+
+Be creative but realistic. Provide ideas that could realistically be executed by a small team initially."""
+        )
+        super().__init__(llm, prompt, cache, bypass_cache)
+    
+    def generate(self, market_analysis: str, focus_area: str = "", additional_context: str = "") -> str:
+        return self.run(
+            market_analysis=market_analysis,
+            focus_area=focus_area,
+            additional_context=additional_context
+        )
+    
+    def generate_stream(self, market_analysis: str, focus_area: str = "", additional_context: str = "") -> Iterator[str]:
+        return self.stream(
+            market_analysis=market_analysis,
+            focus_area=focus_area,
+            additional_context=additional_context
+        )
+
+class CompetitorAnalyzer(LLMAgent):
+    """AI agent for analyzing competitive landscape"""
+    
+    # Articles picked out per idea as the most relevant within the shared article context
+    TOP_K = 8
+    
+    # Everything after ARTICLE_PROMPT_PREFIX, which relevant_articles() sizes its listing against
+    TASK_TEMPLATE = """TASK: Acting as a competitive intelligence analyst, analyze the competitive landscape for this startup idea based on the funding news.
+
+STARTUP IDEA:
+{startup_idea}
+
+ARTICLES MOST RELEVANT TO THIS IDEA (start from these):
+{relevant_articles}
+
+Provide a competitive analysis including:
+
+**1. DIRECT COMPETITORS:**
+- Companies in the same space that recently raised funding
+- Their funding amounts and stages
+- Key differentiators
+
+**2. INDIRECT COMPETITORS:**
+- Adjacent companies that could pivot into this space
+- Potential threats from big tech companies
+
+**3. MARKET OPPORTUNITY:**
+- Market size and growth potential
+- Underserved segments
+- Geographic opportunities
+
+**4. COMPETITIVE POSITIONING:**
+- How to differentiate from existing players
+- Unique value propositions to consider
+- Potential partnerships
+
+**5. RISK ASSESSMENT:**
+- Competition risks
+- Market saturation concerns
+- Barriers to entry
+
+**6. STRATEGIC RECOMMENDATIONS:**
+- Go-to-market strategy
+- Timing considerations
+- Funding strategy
+
+Be specific and reference actual companies from the funding news when relevant."""
+    
+    def __init__(self, llm, cache: LLMCache = None, bypass_cache: bool = False):
+        prompt = PromptTemplate(
+            input_variables=["funding_table", "funding_news", "startup_idea", "relevant_articles"],
+            template=ARTICLE_PROMPT_PREFIX + self.TASK_TEMPLATE
+        )
+        super().__init__(llm, prompt, cache, bypass_cache)
+    
+    def analyze(self, startup_idea: str, funding_news: str, funding_table: str = "",
+                relevant_articles: str = "") -> str:
+        return "".join(self.analyze_stream(startup_idea, funding_news, funding_table, relevant_articles))
+    
+    def analyze_stream(self, startup_idea: str, funding_news: str, funding_table: str = "",
+                       relevant_articles: str = "") -> Iterator[str]:
+        return self.stream(funding_table=funding_table or "not available", funding_news=funding_news,
+                           startup_idea=startup_idea, relevant_articles=relevant_articles or "all of the above")
+    
+    @classmethod
+    def relevant_articles(cls, startup_idea: str, article_index: 'ArticleIndex', k: int = None,
+                          article_context: str = "") -> str:
+        """The articles most relevant to the idea, listed after the shared article prefix.
+        
+        While article_context still holds every article, each one is named by
+        its number there and its title. Once it has been condensed into group
+        summaries those numbers no longer exist, so the articles' excerpts and
+        links are listed instead, as many as fit in the task's share of the
+        context. Either way the retrieval narrows each analysis without
+        costing the prefix's cached context.
+        """
+        with current_tracer().span('retrieve', indexed=len(article_index)) as span:
+            articles = article_index.search(startup_idea, k or cls.TOP_K)
+            if ARTICLE_GROUP_HEADER not in article_context:
+                numbers = {id(article): i for i, article in enumerate(article_index.articles, 1)}
+                entries = [f"- ARTICLE {numbers[id(article)]}: {article['title']}" for article in articles]
+            else:
+                budget = (FundingAnalyzer.TASK_RESERVE - estimate_tokens(cls.TASK_TEMPLATE)
+                          - estimate_tokens(startup_idea))
+                entries = []
+                for article in articles:
+                    entry = f"- {article['title']} ({article['link']})\n  {article['excerpt']}"
+                    budget -= estimate_tokens(entry)
+                    if budget < 0:
+                        break
+                    entries.append(entry)
+            span['articles'] = len(entries)
+        return "\n".join(entries)
+    
+    @classmethod
+    def funding_context(cls, startup_idea: str, article_index: 'ArticleIndex', k: int = None) -> str:
+        """Formatted funding data limited to the articles most relevant to the idea"""
+        with current_tracer().span('retrieve', indexed=len(article_index)) as span:
+            articles = article_index.search(startup_idea, k or cls.TOP_K)
+            funding_data = format_articles_for_analysis(articles)
+            span.update(articles=len(articles), chars=len(funding_data))
+        return funding_data
+    
+    def analyze_many(self, startup_ideas: List[str], funding_news, max_parallel: int = OLLAMA_NUM_PARALLEL,
+                     funding_table: str = "", relevant_articles: List[str] = None) -> Iterator[Tuple[int, str]]:
+        """Analyze several ideas concurrently, yielding (index, analysis) as each finishes.
+        
+        funding_news is either one string shared by every idea, usually the
+        run's article_context(), or a list with one string per idea. A shared
+        prefix is evaluated once up front so the concurrent calls find it
+        cached instead of each evaluating it. relevant_articles has one
+        relevant_articles() listing per idea.
+        """
+        relevant_articles = relevant_articles or [""] * len(startup_ideas)
+        if isinstance(funding_news, str):
+            if len(startup_ideas) > 1 and max_parallel > 1:
+                prime_prompt_prefix(self.llm, ARTICLE_PROMPT_PREFIX.format(
+                    funding_table=funding_table or "not available", funding_news=funding_news
+                ))
+            funding_news = [funding_news] * len(startup_ideas)
+        with ThreadPoolExecutor(max_workers=max(1, max_parallel)) as executor:
+            futures = {
+                submit_in_context(executor, self.analyze, idea, news, funding_table, relevant): i
+                for i, (idea, news, relevant) in enumerate(zip(startup_ideas, funding_news, relevant_articles))
+            }
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+# Characters of an article's full text included in a prompt
+ARTICLE_PROMPT_CHARS = 1200
+
+def format_article(i: int, article: Dict) -> str:
+    also_at = [link for link in article.get('links', []) if link != article['link']]
+    also_line = f"Also reported at: {', '.join(also_at)}\n" if also_at else ""
+    content = article['excerpt']
+    if article.get('body'):
+        body = article['body']
+        content = body[:ARTICLE_PROMPT_CHARS] + ("..." if len(body) > ARTICLE_PROMPT_CHARS else "")
+    return f"""
+ARTICLE {i}:
+Title: {article['title']}
+Source: {article['source']}
+Date: {article['date']}
+Link: {article['link']}
+{also_line}Content: {content}
+
+---
+"""
+
+def format_articles_for_analysis(articles: List[Dict]) -> str:
+    """Format scraped articles for AI analysis"""
+    return "".join(format_article(i, article) for i, article in enumerate(articles, 1))
+
+# "$300M", "$1.2 billion", "$500k", or "20 million" without a currency sign
+AMOUNT_PATTERN = (
+    r'\$\s?(?P<value>\d[\d,]*(?:\.\d+)?)\s?(?P<unit>thousand|million|billion|mn|bn|[kmb])\b'
+    r'|(?P<bare_value>\d[\d,]*(?:\.\d+)?)\s(?P<bare_unit>million|billion)\b'
+)
+# "valued at $80B", "$80B valuation": what the company is worth, not what it raised
+VALUATION_PATTERN = (
+    r'(?:valued\s+at|valuation\s+of|worth)\s+(?:about\s+|over\s+|nearly\s+|more\s+than\s+)?'
+    r'\$?\s?\d[\d,]*(?:\.\d+)?\s?(?:thousand|million|billion|mn|bn|[kmb])\b'
+    r'|\$?\s?\d[\d,]*(?:\.\d+)?\s?(?:thousand|million|billion|mn|bn|[kmb])\b\s+(?:post-money\s+|pre-money\s+)?valuation'
+)
+AMOUNT_UNITS = {'k': 1e3, 'thousand': 1e3, 'm': 1e6, 'mn': 1e6, 'million': 1e6,
+                'b': 1e9, 'bn': 1e9, 'billion': 1e9}
+ROUND_PATTERN = r'\b(?P<round>pre-seed|seed|series\s+[a-h])\b'
+# An excerpt sentence naming a round or a raise, whose amount is taken to be the round's
+RAISE_SENTENCE_PATTERN = r'\b(?:pre-seed|seed|series\s+[a-h]|rais(?:e|es|ed|ing))\b'
+# "AI Startup Anthropic Raises ..." -> "Anthropic"
+COMPANY_PATTERN = (
+    r'^(?:.*?\b(?:startup|company|firm|maker|platform|provider|developer)\s+)?'
+    r'(?P<company>.+?)\s+(?:raises|secures|lands|closes|gets|nabs|bags|banks|snags|announces|completes)\b'
+)
+# First match wins, so verticals come before the general-purpose AI and software buckets
+SECTOR_KEYWORDS = [
+    ("Healthcare", r'health|medical|clinic|biotech|pharma|patient|telehealth|diagnos'),
+    ("Fintech", r'fintech|payment|banking|\bbank\b|lending|credit|insurance|insurtech|payroll'),
+    ("Climate Tech", r'climate|carbon|energy|solar|battery|batteries|\bev\b|emission'),
+    ("EdTech", r'edtech|education|learning platform|school|student'),
+    ("PropTech", r'proptech|real estate|housing|mortgage|property'),
+    ("Web3/Crypto", r'crypto|blockchain|web3|bitcoin|ethereum|defi'),
+    ("Gaming", r'gaming|\bgame'),
+    ("E-commerce", r'e-commerce|ecommerce|retail|marketplace|shopping'),
+    ("IoT/Hardware", r'robot|hardware|\bchips?\b|semiconductor|\biot\b|device|drone|satellite'),
+    ("AI/Machine Learning", r'\bai\b|artificial intelligence|machine learning|\bllms?\b|generative'),
+    ("SaaS/B2B", r'saas|\bb2b\b|enterprise|software|platform for businesses'),
+    ("Consumer Apps", r'consumer|\bapp\b|social'),
+]
+
+def extract_funding_events(articles: List[Dict]):
+    """One row per article with the company, amount (USD), round and sector found in it.
+    
+    Every field is pulled with vectorized pandas string operations over the
+    whole article set; columns are NaN where nothing matched. deal is True
+    where a company or round was found, i.e. the article reports a raise.
+    """
+    events = pd.DataFrame(articles, columns=['title', 'source', 'date', 'link', 'excerpt'])
+    events['title'] = events['title'].fillna("")
+    text = events['title'] + " " + events['excerpt'].fillna("")
+    
+    def amounts(series):
+        series = series.str.replace(VALUATION_PATTERN, " ", regex=True, flags=re.IGNORECASE)
+        found = series.str.extract(AMOUNT_PATTERN, flags=re.IGNORECASE)
+        value = found['value'].fillna(found['bare_value']).str.replace(',', '', regex=False)
+        unit = found['unit'].fillna(found['bare_unit']).str.lower()
+        return pd.to_numeric(value, errors='coerce') * unit.map(AMOUNT_UNITS)
+    
+    # The headline amount is the round. Excerpts also mention valuations, revenue and earlier
+    # rounds, so the fallback only looks at excerpt sentences about a raise
+    sentences = events['excerpt'].fillna("").str.split(r'(?<=[.!?])\s+', regex=True).explode()
+    sentences = sentences[sentences.str.contains(RAISE_SENTENCE_PATTERN, flags=re.IGNORECASE, regex=True)]
+    events['amount_usd'] = amounts(events['title']).fillna(amounts(sentences).groupby(level=0).first())
+    events['round'] = (text.str.extract(ROUND_PATTERN, flags=re.IGNORECASE)['round']
+                       .str.lower().str.replace(r'\s+', ' ', regex=True).str.title())
+    events['company'] = events['title'].str.extract(COMPANY_PATTERN, flags=re.IGNORECASE)['company'].str.strip()
+    lowered = text.str.lower()
+    events['sector'] = np.select(
+        [lowered.str.contains(pattern, regex=True) for _, pattern in SECTOR_KEYWORDS],
+        [sector for sector, _ in SECTOR_KEYWORDS],
+        default="Other"
+    )
+    events['deal'] = events['company'].notna() | events['round'].notna()
+    return events[['company', 'sector', 'round', 'amount_usd', 'title', 'source', 'date', 'link', 'deal']]
+
+def format_usd(amount: float) -> str:
+    if amount is None or amount != amount:
+        return "undisclosed"
+    for threshold, suffix in ((1e9, "B"), (1e6, "M"), (1e3, "K")):
+        if amount >= threshold:
+            return f"${amount / threshold:.3g}{suffix}"
+    return f"${amount:.0f}"
+
+def funding_aggregates(events) -> Dict[str, Any]:
+    """Deal counts and dollar totals overall, per sector and per round (JSON-serializable)"""
+    amounts = events['amount_usd']
+    by_sector = (events.groupby('sector')
+                 .agg(deals=('title', 'size'), total_usd=('amount_usd', 'sum'))
+                 .sort_values(['total_usd', 'deals'], ascending=False)
+                 .reset_index())
+    largest = None
+    if amounts.notna().any():
+        row = events.loc[amounts.idxmax()]
+        largest = {'company': row['company'] if isinstance(row['company'], str) else row['title'],
+                   'amount_usd': float(row['amount_usd'])}
+    return {
+        'deals': int(len(events)),
+        'disclosed': int(amounts.notna().sum()),
+        'total_usd': float(amounts.sum()),
+        'median_usd': float(amounts.median()) if amounts.notna().any() else None,
+        'largest': largest,
+        'sectors': [
+            {'sector': row.sector, 'deals': int(row.deals), 'total_usd': float(row.total_usd)}
+            for row in by_sector.itertuples()
+        ],
+        'rounds': {name: int(count) for name, count in events['round'].value_counts().items()},
+    }
+
+def format_funding_table(events, aggregates: Dict[str, Any], max_rows: int = 25) -> str:
+    """Compact text table of the extracted deals and their aggregates, for prompts"""
+    rows = events.sort_values('amount_usd', ascending=False, na_position='last').head(max_rows)
+    lines = ["Company | Sector | Round | Amount"]
+    for row in rows.itertuples():
+        company = row.company if isinstance(row.company, str) else row.title[:60]
+        funding_round = row.round if isinstance(row.round, str) else "unknown"
+        lines.append(f"{company} | {row.sector} | {funding_round} | {format_usd(row.amount_usd)}")
+    if len(events) > max_rows:
+        lines.append(f"... and {len(events) - max_rows} smaller or undisclosed deals")
+    
+    lines.append(
+        f"Totals: {aggregates['deals']} deals, {aggregates['disclosed']} with disclosed amounts "
+        f"adding up to {format_usd(aggregates['total_usd'])}, median {format_usd(aggregates['median_usd'])}"
+    )
+    lines.append("By sector: " + "; ".join(
+        f"{entry['sector']} {entry['deals']} deals {format_usd(entry['total_usd'])}"
+        for entry in aggregates['sectors']
+    ))
+    if aggregates['rounds']:
+        lines.append("By round: " + ", ".join(f"{name} {count}" for name, count in aggregates['rounds'].items()))
+    return "\n".join(lines)
+
+def summarize_funding(articles: List[Dict]) -> Dict[str, Any]:
+    """Extracted deals, aggregates and prompt table for a set of articles, ready to store with a run"""
+    with current_tracer().span('extract', articles=len(articles)) as span:
+        events = extract_funding_events(articles)
+        # Articles that don't report a raise (analysis, layoffs, IPO chatter) aren't deals
+        events = events[events['deal']]
+        aggregates = funding_aggregates(events)
+        table = format_funding_table(events, aggregates)
+        span['disclosed'] = aggregates['disclosed']
+    records = events[['company', 'sector', 'round', 'amount_usd', 'title', 'date', 'link']].astype(object)
+    return {
+        'aggregates': aggregates,
+        'table': table,
+        'events': records.where(records.notna(), None).to_dict('records'),
+    }
+
+class TrendStore:
+    """Funding events from every run, kept on disk for trend queries over months.
+    
+    Events are appended as Parquet files partitioned by the week of the
+    article (events/week=YYYY-MM-DD/, the Monday), one file per run, so
+    history is never rewritten. Per-week deal counts and totals by sector
+    and by round are kept in rollups.json and updated with each append, so
+    window queries read that small file rather than the events; files that
+    another process appended are folded in when they appear. An event is
+    identified by its normalized article URL and only counted once however
+    many runs scrape it.
+    """
+    
+    def __init__(self, root: str):
+        self.root = root
+        self.events_dir = os.path.join(root, "events")
+        self._rollups_path = os.path.join(root, "rollups.json")
+        self._lock = threading.Lock()
+        os.makedirs(self.events_dir, exist_ok=True)
+        self._rollups = self._load_rollups()
+    
+    def _load_rollups(self) -> Dict[str, Any]:
+        """rollups.json as last written by any process; empty if missing or unreadable"""
+        try:
+            with open(self._rollups_path, encoding='utf-8') as f:
+                rollups = json.load(f)
+            if 'files' in rollups:
+                return rollups
+        except (OSError, ValueError):
+            pass
+        return {'weeks': {}, 'keys': [], 'files': []}
+    
+    def _refresh(self):
+        """Fold in event files the rollups don't cover yet; call with the lock held.
+        
+        Another process (say the nightly CLI run next to the app) may have
+        appended events, or replaced rollups.json with its own copy that
+        lacks ours. Either way the event files are the record: the rollups
+        on disk are reloaded and every file they miss is added to them, which
+        also rebuilds them from scratch when rollups.json was lost.
+        """
+        on_disk = self._event_files()
+        if on_disk <= set(self._rollups['files']):
+            return
+        rollups = self._load_rollups()
+        missing = sorted(on_disk - set(rollups['files']))
+        if missing:
+            self._add_to_rollups(rollups, self._read_events(missing), missing)
+            self._write_rollups(rollups)
+        self._rollups = rollups
+    
+    @staticmethod
+    def _add_to_rollups(rollups: Dict[str, Any], events, files: List[str]):
+        # Two processes may store the same article concurrently; it still counts once
+        events = events[~events['key'].isin(set(rollups['keys']))].drop_duplicates('key')
+        for dimension in ('sector', 'round'):
+            grouped = (events.assign(group=events[dimension].fillna("unknown"))
+                       .groupby(['week', 'group'])['amount_usd']
+                       .agg(['size', 'count', 'sum']))
+            for (week, group), (deals, disclosed, total) in grouped.iterrows():
+                buckets = rollups['weeks'].setdefault(week, {}).setdefault(dimension, {})
+                previous = buckets.get(group, [0, 0, 0.0])
+                buckets[group] = [previous[0] + int(deals), previous[1] + int(disclosed), previous[2] + float(total)]
+        rollups['keys'].extend(events['key'].tolist())
+        rollups['files'].extend(files)
+    
+    def _write_rollups(self, rollups: Dict[str, Any]):
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(rollups, f)
+        os.replace(tmp_path, self._rollups_path)
+    
+    def append(self, records: List[Dict], run_id: str) -> int:
+        """Store the events from summarize_funding() not seen before; returns how many were new"""
+        if not records:
+            return 0
+        events = pd.DataFrame(records)
+        events['key'] = events['link'].map(normalize_url)
+        events['amount_usd'] = pd.to_numeric(events['amount_usd'], errors='coerce')
+        # Undated articles count towards the week they were first seen in
+        dates = pd.to_datetime(events['date'], errors='coerce', format='mixed', utc=True).dt.tz_localize(None)
+        dates = dates.fillna(pd.Timestamp.now()).dt.normalize()
+        events['week'] = (dates - pd.to_timedelta(dates.dt.weekday, unit='D')).dt.strftime('%Y-%m-%d')
+        events['run_id'] = run_id
+        events = events.drop(columns=['date'])
+        
+        with self._lock:
+            self._refresh()
+            known = set(self._rollups['keys'])
+            events = events[~events['key'].isin(known)].drop_duplicates('key')
+            if events.empty:
+                return 0
+            files = []
+            for week, part in events.groupby('week'):
+                week_dir = os.path.join(self.events_dir, f"week={week}")
+                os.makedirs(week_dir, exist_ok=True)
+                part.drop(columns=['week']).to_parquet(os.path.join(week_dir, f"{run_id}.parquet"), index=False)
+                files.append(f"week={week}/{run_id}.parquet")
+            self._add_to_rollups(self._rollups, events, files)
+            self._write_rollups(self._rollups)
+        return len(events)
+    
+    def weeks(self) -> List[str]:
+        with self._lock:
+            self._refresh()
+            return sorted(self._rollups['weeks'])
+    
+    def _cutoff(self, weeks: int) -> str:
+        today = datetime.now()
+        monday = today - timedelta(days=today.weekday())
+        return (monday - timedelta(weeks=weeks - 1)).strftime('%Y-%m-%d')
+    
+    def rollup(self, dimension: str = 'sector', weeks: int = 12) -> List[Dict[str, Any]]:
+        """Deals and dollars per sector (or round) over the last weeks, largest first"""
+        cutoff = self._cutoff(weeks)
+        totals = {}
+        with self._lock:
+            self._refresh()
+            for week, buckets in self._rollups['weeks'].items():
+                if week < cutoff:
+                    continue
+                for group, (deals, disclosed, total) in buckets.get(dimension, {}).items():
+                    entry = totals.setdefault(group, {dimension: group, 'deals': 0, 'disclosed': 0, 'total_usd': 0.0})
+                    entry['deals'] += deals
+                    entry['disclosed'] += disclosed
+                    entry['total_usd'] += total
+        return sorted(totals.values(), key=lambda entry: (entry['total_usd'], entry['deals']), reverse=True)
+    
+    def weekly(self, dimension: str = 'sector', weeks: int = 12) -> Dict[str, Dict[str, float]]:
+        """{week: {sector or round: total_usd}} over the last weeks"""
+        cutoff = self._cutoff(weeks)
+        with self._lock:
+            self._refresh()
+            return {
+                week: {group: values[2] for group, values in buckets.get(dimension, {}).items()}
+                for week, buckets in sorted(self._rollups['weeks'].items()) if week >= cutoff
+            }
+    
+    def _event_files(self, cutoff: str = "") -> set:
+        """Event files as week=YYYY-MM-DD/<run_id>.parquet, from the weeks at or after cutoff"""
+        files = set()
+        for name in os.listdir(self.events_dir):
+            if name.startswith('week=') and name.split('=', 1)[1] >= cutoff:
+                files.update(f"{name}/{file}" for file in os.listdir(os.path.join(self.events_dir, name))
+                             if file.endswith('.parquet'))
+        return files
+    
+    def _read_events(self, files: List[str]):
+        if not files:
+            return pd.DataFrame(columns=['company', 'sector', 'round', 'amount_usd', 'title', 'link',
+                                         'key', 'run_id', 'week'])
+        return pd.concat(
+            [pd.read_parquet(os.path.join(self.events_dir, file)).assign(week=file.split('/')[0].split('=', 1)[1])
+             for file in files],
+            ignore_index=True
+        )
+    
+    def events(self, weeks: int = None):
+        """The stored events themselves, reading only the partitions inside the window"""
+        return self._read_events(sorted(self._event_files(self._cutoff(weeks) if weeks else "")))
+
+def format_trend_table(trend_store: TrendStore, weeks: int = 12) -> str:
+    """Sector totals over earlier runs, for prompts; empty when there is no history"""
+    sectors = trend_store.rollup('sector', weeks)
+    if not sectors:
+        return ""
+    return f"Last {weeks} weeks across all runs: " + "; ".join(
+        f"{entry['sector']} {entry['deals']} deals {format_usd(entry['total_usd'])}" for entry in sectors
+    )
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in into is it its of on or that the their this "
+    "to was were will with who what how which your you our we they them can more new".split()
+)
+
+def tokenize(text: str) -> List[str]:
+    return [w for w in re.findall(r'[a-z0-9$]+', text.lower()) if w not in STOPWORDS and len(w) > 1]
+
+class ArticleIndex:
+    """BM25 keyword index over articles, for picking the ones relevant to a query.
+    
+    Postings are updated as each article is added, so the index grows with
+    the corpus instead of being rebuilt; document frequencies and the
+    average length are read at query time.
+    """
+    
+    def __init__(self, k1: float = 1.5, b: float = 0.75, title_weight: int = 2):
+        self.k1 = k1
+        self.b = b
+        self.title_weight = title_weight
+        self.articles = []
+        self._lengths = []
+        self._total_length = 0
+        self._postings = {}
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self.articles)
+    
+    def add(self, article: Dict) -> int:
+        # Titles name the company and round, so they count several times
+        terms = tokenize(article['title']) * self.title_weight + tokenize(
+            f"{article.get('excerpt', '')} {article.get('body', '')}"
+        )
+        counts = {}
+        for term in terms:
+            counts[term] = counts.get(term, 0) + 1
+        with self._lock:
+            doc_id = len(self.articles)
+            self.articles.append(article)
+            self._lengths.append(len(terms))
+            self._total_length += len(terms)
+            for term, tf in counts.items():
+                self._postings.setdefault(term, {})[doc_id] = tf
+        return doc_id
+    
+    def add_many(self, articles: List[Dict]) -> 'ArticleIndex':
+        for article in articles:
+            self.add(article)
+        return self
+    
+    def scores(self, query: str) -> Dict[int, float]:
+        with self._lock:
+            n = len(self.articles)
+            if not n:
+                return {}
+            avg_length = self._total_length / n or 1
+            scores = {}
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+            return scores
+    
+    def search(self, query: str, k: int = 8) -> List[Dict]:
+        """The k most relevant articles, best first; the first k articles if nothing matches"""
+        scores = self.scores(query)
+        if not scores:
+            return self.articles[:k]
+        best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [self.articles[doc_id] for doc_id, _ in best]
+
+class MinHasher:
+    """MinHash signatures over character or word shingles, with LSH banding for candidate pairs"""
+    
+    # Mersenne prime small enough that a * h + b stays within uint64
+    PRIME = (1 << 31) - 1
+    
+    def __init__(self, num_perm: int = 64, bands: int = 32, shingle_size: int = 4, words: bool = False,
+                 seed: int = 1):
+        rng = random.Random(seed)
+        self.a = np.array([rng.randrange(1, self.PRIME) for _ in range(num_perm)], dtype=np.uint64)
+        self.b = np.array([rng.randrange(0, self.PRIME) for _ in range(num_perm)], dtype=np.uint64)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.words = words
+    
+    def shingles(self, text: str) -> set:
+        tokens = re.findall(r'[a-z0-9$]+', text.lower())
+        k = self.shingle_size
+        if self.words:
+            return {' '.join(tokens[i:i + k]) for i in range(max(1, len(tokens) - k + 1))}
+        text = ' '.join(tokens)
+        return {text[i:i + k] for i in range(max(1, len(text) - k + 1))}
+    
+    def signature(self, text: str) -> Tuple[int, ...]:
+        hashes = np.array([
+            int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=4).digest(), 'little')
+            for s in self.shingles(text)
+        ], dtype=np.uint64) % np.uint64(self.PRIME)
+        # One row per permutation, minimised over all shingles at once
+        permuted = (np.outer(self.a, hashes) + self.b[:, None]) % np.uint64(self.PRIME)
+        return tuple(permuted.min(axis=1).tolist())
+    
+    @staticmethod
+    def similarity(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+        """Estimated Jaccard similarity of the underlying shingle sets"""
+        return sum(x == y for x, y in zip(sig_a, sig_b)) / len(sig_a)
+    
+    def candidate_pairs(self, signatures: List[Tuple[int, ...]]) -> set:
+        pairs = set()
+        for band in range(self.bands):
+            buckets = {}
+            for i, sig in enumerate(signatures):
+                key = sig[band * self.rows:(band + 1) * self.rows]
+                for j in buckets.setdefault(key, []):
+                    pairs.add((j, i))
+                buckets[key].append(i)
+        return pairs
+
+# Headline words that say a deal happened rather than which deal it was
+DEAL_WORDS = frozenset(
+    "raise raises raised secures lands closes gets nabs bags banks snags announces completes "
+    "funding round led".split()
+)
+
+# Calibrated on pairs of real headlines: reports of the same deal score 0.29-1.0 on their
+# title words, while different deals can score 0.5 and are told apart by same_deal()
+DEDUP_THRESHOLD = 0.25
+
+def parse_amount(match) -> float:
+    """USD value of an AMOUNT_PATTERN match"""
+    value = (match.group('value') or match.group('bare_value')).replace(',', '')
+    unit = (match.group('unit') or match.group('bare_unit')).lower()
+    return float(value) * AMOUNT_UNITS[unit]
+
+def deal_key(title: str) -> Dict[str, Any]:
+    """The company, amount and distinguishing words of a funding headline"""
+    amount = re.search(AMOUNT_PATTERN, re.sub(VALUATION_PATTERN, " ", title, flags=re.IGNORECASE), re.IGNORECASE)
+    company = re.search(COMPANY_PATTERN, title, re.IGNORECASE)
+    # "$20M" and "$20 million" become the same word
+    words = re.sub(AMOUNT_PATTERN, lambda m: f" usd{parse_amount(m):.0f} ", title, flags=re.IGNORECASE)
+    return {
+        'company': set(tokenize(company.group('company'))) if company else set(),
+        'amount': parse_amount(amount) if amount else None,
+        'words': ' '.join(w for w in tokenize(words) if w not in DEAL_WORDS),
+    }
+
+def same_deal(a: Dict[str, Any], b: Dict[str, Any]) -> bool:
+    """Whether two deal_key()s can be one deal: company and amount don't conflict and one agrees"""
+    company = amount = None
+    if a['company'] and b['company']:
+        # "Figure" and "Figure AI" are the same company
+        company = a['company'] <= b['company'] or b['company'] <= a['company']
+    if a['amount'] and b['amount']:
+        amount = math.isclose(a['amount'], b['amount'], rel_tol=0.05)
+    return company is not False and amount is not False and bool(company or amount)
+
+def collapse_near_duplicates(articles: List[Dict], threshold: float = DEDUP_THRESHOLD,
+                             hasher: MinHasher = None) -> List[Dict]:
+    """Merge articles reporting the same story into one record that keeps every source link.
+    
+    Similarity is the MinHash estimate of the Jaccard similarity of the
+    titles' words, leaving out amounts' formatting and deal boilerplate;
+    articles are only merged when their headlines name the same company
+    or amount and neither conflicts. A threshold above 1 disables merging.
+    """
+    if threshold > 1 or len(articles) < 2:
+        return articles
+    
+    hasher = hasher or MinHasher(shingle_size=1, words=True)
+    keys = [deal_key(a['title']) for a in articles]
+    signatures = [hasher.signature(key['words']) for key in keys]
+    
+    parent = list(range(len(articles)))
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+    
+    for i, j in hasher.candidate_pairs(signatures):
+        if MinHasher.similarity(signatures[i], signatures[j]) >= threshold and same_deal(keys[i], keys[j]):
+            parent[find(j)] = find(i)
+    
+    clusters = {}
+    for i in range(len(articles)):
+        clusters.setdefault(find(i), []).append(articles[i])
+    
+    merged = []
+    for members in clusters.values():
+        if len(members) == 1:
+            merged.append(members[0])
+            continue
+        # Keep the most informative copy and fold the others' links and sources into it
+        record = dict(max(members, key=lambda a: len(a.get('excerpt', ''))))
+        record['links'] = list(dict.fromkeys(
+            link for a in members for link in (a.get('links') or [a['link']])
+        ))
+        record['source'] = ', '.join(dict.fromkeys(
+            s.strip() for a in members for s in a['source'].split(',')
+        ))
+        record['date'] = record['date'] or next((a['date'] for a in members if a['date']), "")
+        merged.append(record)
+    return merged
+
+IDEA_FIELD_PATTERN = re.compile(r'\*\*([A-Z][A-Z ]+):\*\*\s*(.*?)(?=\*\*[A-Z][A-Z ]+:\*\*|\Z)', re.DOTALL)
+
+def parse_startup_ideas(startup_ideas: str) -> List[Dict]:
+    """Split IdeaGenerator output into one record per idea.
+    
+    Each record has the idea's name and full text plus one lower-case key
+    per labelled field (sector, problem, solution, ...).
+    """
+    ideas = []
+    for block in startup_ideas.split("**IDEA NAME:**")[1:]:
+        # The last idea runs into the generator's closing remarks
+        block = block.split("**ADDITIONAL CONSIDERATIONS:**")[0].strip()
+        name = block.split("\n", 1)[0].split("**SECTOR:**")[0].strip(" *-[]")
+        if name:
+            idea = {'name': name, 'text': f"**IDEA NAME:** {block}"}
+            for label, value in IDEA_FIELD_PATTERN.findall(idea['text']):
+                key = label.strip().lower().replace(' ', '_')
+                if key != 'idea_name':
+                    idea[key] = value.strip(" *-[]\n")
+            ideas.append(idea)
+    return ideas
+
+def normalize_sector(sector: str) -> str:
+    """Coarse sector label: 'Fintech / Payments' and 'fintech' both become 'fintech'"""
+    label = re.split(r'[/,(&]| and ', (sector or "").lower())[0]
+    return ' '.join(label.split()) or "unspecified"
+
+class HashingEmbedder:
+    """Deterministic bag-of-words embeddings using the hashing trick.
+    
+    Needs no model, so ideas can be indexed anywhere (and tests and
+    benchmarks are reproducible); ideas that share vocabulary end up close
+    together. OllamaEmbedder gives semantically better vectors.
+    """
+    
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+    
+    def features(self, text: str) -> List[str]:
+        words = [w for w in re.findall(r'[a-z0-9]+', text.lower()) if len(w) > 2]
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    
+    def embed(self, texts: List[str]):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self.features(text):
+                digest = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'little')
+                # Low bits pick the column, the top bit the sign, so collisions tend to cancel
+                vectors[row, digest % self.dim] += 1.0 if digest >> 63 else -1.0
+        return normalize_rows(vectors)
+
+class OllamaEmbedder:
+    """Embeddings from an Ollama embedding model such as nomic-embed-text"""
+    
+    def __init__(self, model: str):
+        self._embeddings = OllamaEmbeddings(model=model)
+        self.name = f"ollama-{re.sub(r'[^A-Za-z0-9.-]+', '-', model)}"
+    
+    def embed(self, texts: List[str]):
+        return normalize_rows(np.asarray(self._embeddings.embed_documents(texts), dtype=np.float32))
+
+def normalize_rows(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+class IdeaIndex:
+    """Every generated idea with its embedding, searchable by cosine similarity.
+    
+    Vectors are unit-length rows of a single float32 matrix, so a batch of
+    queries is scored against the whole history with one matrix product.
+    On disk the index is an append-only raw float32 file plus a JSON Lines
+    file of records, one pair per embedder since vectors from different
+    models can't be compared.
+    """
+    
+    # Cosine similarity above which a new idea counts as a repeat of an old one
+    REPEAT_THRESHOLD = 0.85
+    
+    def __init__(self, index_dir: str, embedder):
+        self.embedder = embedder
+        self._lock = threading.Lock()
+        os.makedirs(index_dir, exist_ok=True)
+        self._vectors_path = os.path.join(index_dir, f"{embedder.name}.f32")
+        self._records_path = os.path.join(index_dir, f"{embedder.name}.jsonl")
+        self._meta_path = os.path.join(index_dir, f"{embedder.name}.meta.json")
+        
+        self.records = []
+        if os.path.exists(self._records_path):
+            with open(self._records_path, encoding='utf-8') as f:
+                self.records = [json.loads(line) for line in f if line.strip()]
+        vectors = np.zeros((0, 0), dtype=np.float32)
+        if os.path.exists(self._meta_path) and os.path.exists(self._vectors_path):
+            with open(self._meta_path, encoding='utf-8') as f:
+                dim = json.load(f)['dim']
+            vectors = np.fromfile(self._vectors_path, dtype=np.float32)
+            vectors = vectors[:vectors.size - vectors.size % dim].reshape(-1, dim)
+        # A write interrupted between the two files leaves them out of step
+        self._size = min(len(self.records), len(vectors))
+        out_of_step = len(self.records) != len(vectors)
+        self.records = self.records[:self._size]
+        self._vectors = vectors[:self._size].copy()
+        if out_of_step:
+            self._rewrite()
+    
+    def _rewrite(self):
+        """Truncate both files to the entries they have in common"""
+        self.vectors.tofile(self._vectors_path)
+        with open(self._records_path, 'w', encoding='utf-8') as f:
+            for record in self.records:
+                f.write(json.dumps(record) + "\n")
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    @property
+    def vectors(self):
+        return self._vectors[:self._size]
+    
+    def embed(self, ideas: List[Dict]):
+        return self.embedder.embed([idea['text'] for idea in ideas])
+    
+    def add(self, records: List[Dict], vectors) -> None:
+        """Append records with their (unit-length) vectors, in memory and on disk"""
+        if not records:
+            return
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with self._lock:
+            if not self._size:
+                with open(self._meta_path, 'w', encoding='utf-8') as f:
+                    json.dump({'dim': vectors.shape[1]}, f)
+            if self._size + len(records) > len(self._vectors) or self._vectors.shape[1] != vectors.shape[1]:
+                # Grow geometrically so repeated small adds stay cheap
+                capacity = max(64, 2 * (self._size + len(records)))
+                grown = np.zeros((capacity, vectors.shape[1]), dtype=np.float32)
+                if self._size:
+                    grown[:self._size] = self.vectors
+                self._vectors = grown
+            self._vectors[self._size:self._size + len(records)] = vectors
+            self.records.extend(records)
+            self._size += len(records)
+            
+            with open(self._vectors_path, 'ab') as f:
+                vectors.tofile(f)
+            with open(self._records_path, 'a', encoding='utf-8') as f:
+                for record in records:
+                    f.write(json.dumps(record) + "\n")
+    
+    def search(self, queries, k: int = 5) -> List[List[Tuple[float, Dict]]]:
+        """The k most similar past ideas for each query vector, best first"""
+        with self._lock:
+            size = self._size
+            if not size:
+                return [[] for _ in range(len(queries))]
+            scores = self._vectors[:size] @ np.asarray(queries, dtype=np.float32).T
+            records = self.records[:size]
+        k = min(k, size)
+        # Partial sort per column, then order only the k survivors
+        top = np.argpartition(-scores, k - 1, axis=0)[:k]
+        results = []
+        for column in range(scores.shape[1]):
+            rows = top[:, column]
+            rows = rows[np.argsort(-scores[rows, column])]
+            results.append([(float(scores[row, column]), records[row]) for row in rows])
+        return results
+    
+    def similar(self, text: str, k: int = 10) -> List[Tuple[float, Dict]]:
+        return self.search(self.embedder.embed([text]), k)[0]
+    
+    def index_ideas(self, ideas: List[Dict], **meta) -> List[Dict]:
+        """Flag ideas that repeat earlier ones, then add them to the index.
+        
+        Returns, per idea, the closest earlier idea at or above
+        REPEAT_THRESHOLD (None otherwise). meta (run ID, focus area, ...) is
+        stored with every record.
+        """
+        if not ideas:
+            return []
+        vectors = self.embed(ideas)
+        matches = self.search(vectors, k=1)
+        created_at = datetime.now().isoformat(timespec='seconds')
+        repeats = []
+        records = []
+        for idea, best in zip(ideas, matches):
+            repeat = None
+            if best and best[0][0] >= self.REPEAT_THRESHOLD:
+                score, record = best[0]
+                repeat = {'name': record['name'], 'created_at': record['created_at'], 'score': round(score, 3)}
+            repeats.append(repeat)
+            records.append({
+                'name': idea['name'],
+                'sector': idea.get('sector', ""),
+                'problem': idea.get('problem', ""),
+                'created_at': created_at,
+                'repeat_of': repeat['name'] if repeat else None,
+                **meta,
+            })
+        self.add(records, vectors)
+        return repeats
+    
+    def sector_clusters(self) -> List[Dict]:
+        """Ideas grouped by normalized sector, with how tightly each group clusters"""
+        with self._lock:
+            vectors = self.vectors
+            records = self.records[:self._size]
+        groups = {}
+        for row, record in enumerate(records):
+            groups.setdefault(normalize_sector(record.get('sector')), []).append(row)
+        
+        clusters = []
+        for sector, rows in groups.items():
+            members = vectors[rows]
+            centroid = members.mean(axis=0)
+            centroid /= max(float(np.linalg.norm(centroid)), 1e-12)
+            closeness = members @ centroid
+            clusters.append({
+                'sector': sector,
+                'ideas': len(rows),
+                'repeats': sum(1 for row in rows if records[row].get('repeat_of')),
+                'cohesion': round(float(closeness.mean()), 3),
+                'most_typical': records[rows[int(closeness.argmax())]]['name'],
+            })
+        return sorted(clusters, key=lambda cluster: cluster['ideas'], reverse=True)
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for English prose (about four characters per token)"""
+    return len(text) // 4 + 1
+
+def chunk_texts(texts: List[str], budget_tokens: int) -> List[List[str]]:
+    """Greedily pack texts, in order, into chunks that fit the token budget"""
+    chunks = []
+    current = []
+    used = 0
+    for text in texts:
+        tokens = estimate_tokens(text)
+        if tokens > budget_tokens:
+            text = text[:budget_tokens * 4]
+            tokens = budget_tokens
+        if current and used + tokens > budget_tokens:
+            chunks.append(current)
+            current = []
+            used = 0
+        current.append(text)
+        used += tokens
+    if current:
+        chunks.append(current)
+    return chunks
+
+def create_agents(llm, bypass_cache: bool = False, context_tokens: int = 4096,
+                  max_parallel: int = OLLAMA_NUM_PARALLEL,
+                  stage_llms: Dict[str, Any] = None) -> Tuple[FundingAnalyzer, IdeaGenerator, CompetitorAnalyzer]:
+    """Build the agents; stage_llms maps any of MODEL_STAGES to a model other than llm"""
+    stage_llms = stage_llms or {}
+    llm_cache = LLMCache(os.path.join(CACHE_DIR, "llm"))
+    funding_analyzer = FundingAnalyzer(
+        stage_llms.get('analysis', llm), llm_cache, bypass_cache,
+        context_tokens=context_tokens,
+        max_parallel=max_parallel,
+        map_llm=stage_llms.get('map')
+    )
+    idea_generator = IdeaGenerator(stage_llms.get('ideas', llm), llm_cache, bypass_cache)
+    competitor_analyzer = CompetitorAnalyzer(stage_llms.get('competition', llm), llm_cache, bypass_cache)
+    return funding_analyzer, idea_generator, competitor_analyzer
+
+@st.cache_resource(show_spinner=False)
+def get_agents(model_name: str, context_tokens: int, max_parallel: int, bypass_cache: bool,
+               map_model: str = None) -> Tuple[FundingAnalyzer, IdeaGenerator, CompetitorAnalyzer]:
+    """Agents for one model and settings combination, built once per process"""
+    stage_llms = {'map': get_llm(map_model, context_tokens)} if map_model else None
+    return create_agents(get_llm(model_name, context_tokens), bypass_cache, context_tokens, max_parallel,
+                         stage_llms)
+
+@st.cache_resource(show_spinner=False)
+def get_article_store() -> ArticleStore:
+    return ArticleStore(os.path.join(CACHE_DIR, "articles.db"))
+
+def make_embedder():
+    """Ollama embeddings when STARTUP_IDEAS_EMBED_MODEL names a model, else the hashing stand-in"""
+    model = os.environ.get("STARTUP_IDEAS_EMBED_MODEL")
+    return OllamaEmbedder(model) if model else HashingEmbedder()
+
+@st.cache_resource(show_spinner=False)
+def get_idea_index() -> IdeaIndex:
+    return IdeaIndex(os.path.join(CACHE_DIR, "ideas"), make_embedder())
 
-ADDITIONAL CONTEXT: {additional_context}
+@st.cache_resource(show_spinner=False)
+def get_trend_store() -> TrendStore:
+    return TrendStore(os.path.join(CACHE_DIR, "trends"))
 
-Generate 5-7 innovative startup ideas that could attract funding based on current trends. For each idea provide:
+@st.cache_resource(show_spinner=False)
+def get_stage_cache() -> LLMCache:
+    return LLMCache(os.path.join(CACHE_DIR, "stages"), ttl=86400, max_bytes=50 * 1024 * 1024)
 
-**IDEA NAME:** [Creative name]
-**SECTOR:** [Industry/Category]
-**PROBLEM:** [What problem it solves]
-**SOLUTION:** [How it works]
-**TARGET MARKET:** [Who would use it]
-**BUSINESS MODEL:** [How it makes money]
-**FUNDING POTENTIAL:** [Why investors would be interested]
-**COMPETITIVE ADVANTAGE:** [What makes it unique]
-**MVP SUGGESTION:** [How to start small]
+@st.cache_resource(show_spinner=False)
+def get_scraper(cache_ttl: int, incremental: bool) -> WebScraper:
+    # The scraper keeps no per-run state, so sessions share it and its connection pool
+    return WebScraper(cache_ttl=cache_ttl, store=get_article_store(), incremental=incremental)
 
-**ADDITIONAL CONSIDERATIONS:**
-- Focus on ideas that align with current funding trends
-- Consider emerging technologies (AI, blockchain, IoT, etc.)
-- Think about underserved markets
-- Consider B2B vs B2C opportunities
-- Factor in scalability and market size
+class LogBuffer:
+    """Bounded, thread-safe sink for progress messages.
+    
+    Writers never touch the UI. Readers render the buffered tail as a single
+    element, so the cost of showing the log doesn't grow with its length.
+    """
+    
+    def __init__(self, max_lines: int = 500, lines: List[str] = None):
+        self._lines = deque(lines or [], maxlen=max_lines)
+        self.dropped = 0
+        self._lock = threading.Lock()
+    
+    def __call__(self, message: str):
+        with self._lock:
+            if len(self._lines) == self._lines.maxlen:
+                self.dropped += 1
+            self._lines.append(message)
+    
+    def __len__(self) -> int:
+        return len(self._lines)
+    
+    def lines(self) -> List[str]:
+        with self._lock:
+            return list(self._lines)
+    
+    def text(self) -> str:
+        lines = self.lines()
+        if self.dropped:
+            lines.insert(0, f"... {self.dropped} earlier messages omitted")
+        return "\n".join(lines)
 
-Be creative but realistic. Provide ideas that could realistically be executed by a small team initially."""
-        )
-        self.chain = LLMChain(llm=self.llm, prompt=self.prompt)
+class ResearchJob:
+    """State of one research pipeline run, shared by its worker thread and the UI"""
     
-    def generate(self, market_analysis: str, focus_area: str = "", additional_context: str = "") -> str:
-        return self.chain.run(
-            market_analysis=market_analysis,
-            focus_area=focus_area,
-            additional_context=additional_context
+    PERSISTED_FIELDS = ('id', 'params', 'status', 'stage', 'progress', 'log', 'results',
+                        'timings', 'spans', 'error', 'traceback', 'created_at', 'updated_at')
+    
+    def __init__(self, job_id: str, params: Dict, on_change=None):
+        self.id = job_id
+        self.params = params
+        self.status = 'queued'
+        self.stage = "Waiting for a free worker..."
+        self.progress = 0
+        self.log = LogBuffer()
+        self.results = {}
+        self.partial = {}
+        self.timings = {}
+        self.tracer = Tracer()
+        self.spans = self.tracer.spans
+        self.error = None
+        self.traceback = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self._on_change = on_change
+    
+    @property
+    def finished(self) -> bool:
+        return self.status in ('done', 'error', 'interrupted')
+    
+    def _changed(self):
+        self.updated_at = time.time()
+        if self._on_change:
+            self._on_change(self)
+    
+    def set_stage(self, stage: str, progress: int):
+        self.stage = stage
+        self.progress = progress
+        self._changed()
+    
+    def write(self, message: str):
+        self.log(message)
+    
+    def set_result(self, key: str, value: Any):
+        """Record the output of a completed stage"""
+        self.results[key] = value
+        self.partial.pop(key, None)
+        self._changed()
+    
+    def stream(self, key: str, tokens: Iterator[str]) -> str:
+        """Consume streamed model output, exposing it to the UI as it grows"""
+        start = time.perf_counter()
+        parts = self.partial[key] = []
+        for token in tokens:
+            if not parts:
+                self.timings[key] = {'first_token': time.perf_counter() - start}
+            parts.append(token)
+        self.timings.setdefault(key, {'first_token': None})['total'] = time.perf_counter() - start
+        text = "".join(parts)
+        self.set_result(key, text)
+        return text
+    
+    def partial_text(self, key: str) -> str:
+        if key in self.results:
+            return self.results[key]
+        return "".join(list(self.partial.get(key, [])))
+    
+    def to_dict(self) -> Dict:
+        data = {field: getattr(self, field) for field in self.PERSISTED_FIELDS}
+        data['log'] = self.log.lines()
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ResearchJob':
+        job = cls(data['id'], data.get('params', {}))
+        for field in cls.PERSISTED_FIELDS:
+            if field in data:
+                setattr(job, field, data[field])
+        job.log = LogBuffer(lines=data.get('log'))
+        return job
+
+class JobManager:
+    """Process-wide worker pool for research jobs.
+    
+    Jobs run outside the Streamlit script thread, so reruns and reconnects
+    don't interrupt them. Each job's state is written to disk as its stages
+    complete, and sessions find their job again by ID.
+    """
+    
+    def __init__(self, jobs_dir: str, max_workers: int = 2, max_saved_jobs: int = 100):
+        self.jobs_dir = jobs_dir
+        self.max_saved_jobs = max_saved_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="research-job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+        os.makedirs(jobs_dir, exist_ok=True)
+    
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.jobs_dir, f"{job_id}.json")
+    
+    def submit(self, pipeline, params: Dict, **components) -> ResearchJob:
+        """Queue pipeline(job, **components); the job reads its settings from params"""
+        job = ResearchJob(uuid.uuid4().hex[:12], params, on_change=self.save)
+        with self._lock:
+            self._jobs[job.id] = job
+        self.save(job)
+        self._prune()
+        self._executor.submit(self._run, job, pipeline, components)
+        return job
+    
+    def _run(self, job: ResearchJob, pipeline, components: Dict):
+        job.status = 'running'
+        try:
+            with use_tracer(job.tracer), use_requester(job.params.get('session', job.id)):
+                pipeline(job, **components)
+            job.status = 'done'
+        except Exception as e:
+            job.status = 'error'
+            job.error = str(e)
+            job.traceback = traceback.format_exc()
+        finally:
+            try:
+                export_run_metrics(job.tracer, job.id)
+            except OSError:
+                pass
+            job._changed()
+    
+    def get(self, job_id: str) -> ResearchJob:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None:
+            return job
+        
+        if not re.fullmatch(r'[0-9a-f]{12}', job_id or ''):
+            return None
+        try:
+            with open(self._path(job_id), 'r', encoding='utf-8') as f:
+                job = ResearchJob.from_dict(json.load(f))
+        except (OSError, ValueError):
+            return None
+        
+        # Saved by a process that has since exited
+        if not job.finished:
+            job.status = 'interrupted'
+        return job
+    
+    def queue_position(self, job: ResearchJob) -> int:
+        with self._lock:
+            return sum(1 for other in self._jobs.values()
+                       if other.status == 'queued' and other.created_at < job.created_at)
+    
+    def save(self, job: ResearchJob):
+        data = json.dumps(job.to_dict(), default=str).encode('utf-8')
+        fd, tmp_path = tempfile.mkstemp(dir=self.jobs_dir, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, self._path(job.id))
+    
+    def _prune(self):
+        saved = sorted(
+            (entry.stat().st_mtime, entry.path) for entry in os.scandir(self.jobs_dir)
+            if entry.name.endswith('.json')
         )
+        for _, path in saved[:-self.max_saved_jobs]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        with self._lock:
+            for job_id in [j.id for j in self._jobs.values() if j.finished][:-self.max_saved_jobs]:
+                self._jobs.pop(job_id, None)
 
-class CompetitorAnalyzer:
-    """AI agent for analyzing competitive landscape"""
+@st.cache_resource
+def get_job_manager() -> JobManager:
+    return JobManager(os.path.join(CACHE_DIR, "jobs"))
+
+def gather_articles(params: Dict, scraper: WebScraper, article_store: ArticleStore,
+                    log=None, set_stage=None) -> List[Dict]:
+    """Scrape (or load sample) articles for a run and collapse near-duplicates.
     
-    def __init__(self, llm):
-        self.llm = llm
-        self.prompt = PromptTemplate(
-            input_variables=["startup_idea", "funding_data"],
-            template="""You are a competitive intelligence analyst. Analyze the competitive landscape for a startup idea based on recent funding data.
+    Returns an empty list when an incremental run finds nothing new.
+    """
+    log = log or (lambda message: None)
+    set_stage = set_stage or (lambda stage, progress: log(stage))
+    num_articles = params['num_articles']
+    all_articles = []
+    
+    if params['use_sample_data']:
+        set_stage("Using sample funding data...", 30)
+        
+        all_articles = scraper.get_sample_funding_data()
+        log(f"Using {len(all_articles)} sample articles")
+        
+    else:
+        set_stage("Scraping funding news from various sources...", 10)
+        
+        run_started = article_store.begin_run()
+        
+        log("🔍 Scraping TechCrunch and VentureBeat concurrently...")
+        
+        with current_tracer().span('scrape') as span:
+            scraped = scraper.scrape_sources({
+                'TechCrunch': num_articles,
+                'VentureBeat': min(num_articles//2, 5),
+            }, log=log)
+            span['articles'] = sum(len(found) for found in scraped.values())
+        techcrunch_articles = scraped['TechCrunch']
+        venturebeat_articles = scraped['VentureBeat']
+        
+        log(f"TechCrunch results: {len(techcrunch_articles)} articles")
+        log(f"VentureBeat results: {len(venturebeat_articles)} articles")
+        
+        all_articles = techcrunch_articles + venturebeat_articles
+        
+        article_window = params['article_window']
+        if article_window == "New since last run":
+            all_articles = article_store.articles_since(run_started)
+            if not all_articles:
+                return []
+        elif article_window != "Latest scrape":
+            days = int(article_window.split()[1])
+            all_articles = article_store.recent(days, limit=num_articles)
+        
+        if not all_articles:
+            log("Web scraping didn't find articles. Using sample data instead.")
+            all_articles = scraper.get_sample_funding_data()
+    
+    if not all_articles:
+        raise RuntimeError("No funding articles found even with sample data.")
+    
+    scraped_count = len(all_articles)
+    with current_tracer().span('dedup', articles=scraped_count) as span:
+        all_articles = collapse_near_duplicates(all_articles, params['dedup_threshold'])
+        span['merged'] = scraped_count - len(all_articles)
+    if len(all_articles) < scraped_count:
+        log(f"Merged {scraped_count - len(all_articles)} near-duplicate articles")
+    
+    if params.get('fetch_bodies'):
+        set_stage(f"Fetching full text of {len(all_articles)} articles...", 30)
+        with current_tracer().span('enrich', articles=len(all_articles)) as span:
+            all_articles = scraper.fetch_bodies(all_articles, log=log)
+            span['with_body'] = sum(1 for article in all_articles if article.get('body'))
+    
+    return all_articles
 
-STARTUP IDEA:
-{startup_idea}
+def focus_instruction(focus_area: str) -> str:
+    return f"Focus on {focus_area}" if focus_area != "All Sectors" else ""
 
-RECENT FUNDING DATA:
-{funding_data}
+def record_trends(trend_store: TrendStore, funding: Dict[str, Any], run_id: str, params: Dict,
+                  log=None) -> str:
+    """Append a run's funding events to the trend store; returns its prompt table with the trend added"""
+    log = log or (lambda message: None)
+    with current_tracer().span('trends') as span:
+        # Sample articles are fixed examples, not market data
+        if not params.get('use_sample_data'):
+            span['new_events'] = trend_store.append(funding['events'], run_id)
+            log(f"Recorded {span['new_events']} new funding events for trend analysis")
+        trend = format_trend_table(trend_store)
+    return f"{funding['table']}\n{trend}" if trend else funding['table']
 
-Provide a competitive analysis including:
+def index_ideas(idea_index: IdeaIndex, ideas: List[Dict], log=None, **meta) -> List[Dict]:
+    """Record ideas in the index; per idea, the earlier idea it repeats or None"""
+    log = log or (lambda message: None)
+    with current_tracer().span('idea_index', ideas=len(ideas), indexed=len(idea_index)):
+        try:
+            repeats = idea_index.index_ideas(ideas, **meta)
+        except Exception as e:
+            # The index is a convenience; a broken embedder shouldn't fail the run
+            log(f"Could not index ideas: {str(e)}")
+            return []
+    
+    flagged = sum(1 for repeat in repeats if repeat)
+    if flagged:
+        log(f"{flagged} of {len(ideas)} ideas repeat earlier ones")
+    return [
+        {'name': idea['name'], 'sector': idea.get('sector', ""), 'repeat_of': repeat}
+        for idea, repeat in zip(ideas, repeats)
+    ]
 
-**1. DIRECT COMPETITORS:**
-- Companies in the same space that recently raised funding
-- Their funding amounts and stages
-- Key differentiators
+def content_hash(value: Any) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode('utf-8')).hexdigest()
 
-**2. INDIRECT COMPETITORS:**
-- Adjacent companies that could pivot into this space
-- Potential threats from big tech companies
+class StageGraph:
+    """Runs pipeline stages, reusing a stored result when a stage's inputs are unchanged.
 
-**3. MARKET OPPORTUNITY:**
-- Market size and growth potential
-- Underserved segments
-- Geographic opportunities
+    Each stage names everything its result depends on: parameters, the
+    models it calls and hashes of upstream results. The hash of those inputs
+    is its fingerprint, and results are stored under it (in an LLMCache, so
+    they persist across runs and restarts). Changing one input therefore
+    recomputes only the stages that depend on it, directly or through an
+    upstream result that actually changed.
+    """
+    
+    def __init__(self, cache: LLMCache = None):
+        self.cache = cache
+        self.status = {}
+    
+    def run(self, name: str, inputs: Dict[str, Any], compute, force: bool = False):
+        key = content_hash({'stage': name, 'inputs': inputs})
+        with current_tracer().span('stage', stage=name) as span:
+            result = None
+            if self.cache is not None and not force:
+                result = self.cache.get(key)
+            span['reused'] = result is not None
+            if result is None:
+                result = compute()
+                if self.cache is not None:
+                    self.cache.put(key, result)
+        self.status[name] = 'reused' if span['reused'] else 'computed'
+        return result
 
-**4. COMPETITIVE POSITIONING:**
-- How to differentiate from existing players
-- Unique value propositions to consider
-- Potential partnerships
+def run_research_pipeline(job: ResearchJob, scraper: WebScraper, article_store: ArticleStore,
+                          funding_analyzer: FundingAnalyzer, idea_generator: IdeaGenerator,
+                          competitor_analyzer: CompetitorAnalyzer, idea_index: IdeaIndex = None,
+                          trend_store: TrendStore = None, stage_cache: LLMCache = None):
+    """Scrape, analyze, generate ideas and assess competition, reporting into job.
 
-**5. RISK ASSESSMENT:**
-- Competition risks
-- Market saturation concerns
-- Barriers to entry
+    The stages form a chain (articles -> funding figures -> article context
+    -> market analysis -> ideas -> competition); with a stage_cache, a stage
+    whose inputs match an earlier run reuses that run's result, so changing
+    only the focus area or context regenerates the ideas and their
+    competition, nothing else.
+    """
+    params = job.params
+    stages = StageGraph(stage_cache)
+    
+    # Scraped pages are treated as unchanged for as long as they are cached
+    scrape_inputs = {key: params.get(key) for key in (
+        'use_sample_data', 'num_articles', 'article_window', 'dedup_threshold', 'fetch_bodies'
+    )}
+    scrape_ttl = params.get('scrape_ttl', 900)
+    live = not params['use_sample_data']
+    if live and scrape_ttl > 0:
+        scrape_inputs['period'] = int(time.time() // scrape_ttl)
+    # With no page caching, and for "New since last run", which depends on the
+    # store's history, every run scrapes
+    all_articles = stages.run('articles', scrape_inputs, lambda: gather_articles(
+        params, scraper, article_store, log=job.write, set_stage=job.set_stage
+    ), force=live and (scrape_ttl <= 0 or params['article_window'] == "New since last run"))
+    if not all_articles:
+        job.set_stage("No new funding articles since the last run.", 100)
+        return
+    
+    job.set_result('articles', all_articles)
+    articles_hash = content_hash(all_articles)
+    
+    def extract_funding():
+        funding = summarize_funding(all_articles)
+        if trend_store is not None:
+            funding['table'] = record_trends(trend_store, funding, job.id, params, log=job.write)
+        return funding
+    
+    funding = stages.run('funding', {'articles': articles_hash}, extract_funding)
+    job.set_result('funding', funding)
+    
+    # Analyze funding trends
+    job.set_stage(f"Analyzing funding trends across {len(all_articles)} articles...", 40)
+    
+    # The articles as every later prompt over them starts, condensed if they don't fit
+    article_context = stages.run('article_context', {
+        'articles': articles_hash,
+        'funding_table': funding['table'],
+        'map_model': getattr(funding_analyzer.map_llm, 'model', None),
+        'context_tokens': funding_analyzer.context_tokens,
+    }, lambda: funding_analyzer.article_context(
+        all_articles,
+        on_progress=lambda done, total: job.set_stage(f"Summarizing article groups ({done}/{total})...", 40),
+        funding_table=funding['table']
+    ), force=funding_analyzer.bypass_cache)
+    job.set_result('article_context', article_context)
+    context_hash = content_hash([funding['table'], article_context])
+    
+    market_analysis = stages.run('market_analysis', {
+        'article_context': context_hash,
+        'model': funding_analyzer.model_name,
+    }, lambda: job.stream('market_analysis', funding_analyzer.analyze_stream(article_context, funding['table'])),
+        force=funding_analyzer.bypass_cache)
+    job.set_result('market_analysis', market_analysis)
+    
+    # Generate startup ideas
+    job.set_stage("Generating startup ideas...", 70)
+    
+    def generate_ideas():
+        startup_ideas = job.stream('startup_ideas', idea_generator.generate_stream(
+            market_analysis, focus_instruction(params['focus_area']), params['additional_context']
+        ))
+        ideas = parse_startup_ideas(startup_ideas)
+        repeats = []
+        if idea_index is not None and ideas:
+            repeats = index_ideas(idea_index, ideas, log=job.write, run_id=job.id, focus_area=params['focus_area'])
+        return {'startup_ideas': startup_ideas, 'idea_repeats': repeats}
+    
+    generated = stages.run('startup_ideas', {
+        'market_analysis': content_hash(market_analysis),
+        'focus_area': params['focus_area'],
+        'additional_context': params['additional_context'],
+        'model': idea_generator.model_name,
+    }, generate_ideas, force=idea_generator.bypass_cache)
+    startup_ideas = generated['startup_ideas']
+    job.set_result('startup_ideas', startup_ideas)
+    job.set_result('idea_repeats', generated['idea_repeats'])
+    
+    # Analyze every idea's competition
+    ideas = parse_startup_ideas(startup_ideas) or [
+        {'name': "AI-powered business solution", 'text': "AI-powered business solution"}
+    ]
+    job.set_stage(f"Analyzing competitive landscape for {len(ideas)} ideas...", 80)
+    
+    def analyze_competition():
+        with current_tracer().span('article_index', articles=len(all_articles)):
+            article_index = ArticleIndex().add_many(all_articles)
+        
+        competition = [{'name': idea['name'], 'analysis': None} for idea in ideas]
+        job.set_result('competition', competition)
+        
+        # Every analysis shares the market analysis's article prefix, which Ollama has cached,
+        # and names the articles most relevant to its idea after it
+        idea_texts = [idea['text'] for idea in ideas]
+        relevant = [CompetitorAnalyzer.relevant_articles(text, article_index, article_context=article_context)
+                    for text in idea_texts]
+        for done, (i, analysis) in enumerate(competitor_analyzer.analyze_many(
+            idea_texts, article_context, params['max_parallel'], funding['table'], relevant
+        ), 1):
+            competition[i]['analysis'] = analysis
+            job.set_stage(f"Analyzed competition for {done}/{len(ideas)} ideas...", 80 + 20 * done // len(ideas))
+        return competition
+    
+    competition = stages.run('competition', {
+        'ideas': content_hash([idea['text'] for idea in ideas]),
+        'article_context': context_hash,
+        'top_k': CompetitorAnalyzer.TOP_K,
+        'model': competitor_analyzer.model_name,
+    }, analyze_competition, force=competitor_analyzer.bypass_cache)
+    job.set_result('competition', competition)
+    
+    job.set_result('competitive_analysis', "\n\n".join(
+        f"#### {item['name']}\n\n{item['analysis']}" for item in competition
+    ))
+    job.set_result('stages', stages.status)
+    job.set_stage("Analysis complete!", 100)
 
-**6. STRATEGIC RECOMMENDATIONS:**
-- Go-to-market strategy
-- Timing considerations
-- Funding strategy
+def render_timing(job: ResearchJob, key: str):
+    timing = job.timings.get(key) or {}
+    if timing.get('first_token') is None:
+        return
+    caption = f"First token after {timing['first_token']:.1f}s"
+    if 'total' in timing:
+        caption += f" · complete after {timing['total']:.1f}s"
+    st.caption(caption)
 
-Be specific and reference actual companies from the funding data when relevant."""
+def render_spans(job: ResearchJob):
+    """Debug panel showing where a run's time went"""
+    with st.expander("⏱️ Timing & tokens"):
+        summary = summarize_spans(job.spans)
+        st.dataframe(
+            pd.DataFrame.from_dict(summary, orient='index').rename_axis('stage').round(3),
+            use_container_width=True
         )
-        self.chain = LLMChain(llm=self.llm, prompt=self.prompt)
+        
+        llm_calls = [span for span in job.spans if span['name'] == 'llm']
+        if llm_calls:
+            st.markdown("**Model calls**")
+            columns = ['agent', 'step', 'cached', 'wall_s', 'first_token_s', 'prompt_tokens',
+                       'completion_tokens', 'tokens_per_sec', 'prompt_eval_s', 'load_s']
+            st.dataframe(pd.DataFrame(llm_calls).reindex(columns=columns), use_container_width=True)
+        
+        fetches = [span for span in job.spans if span['name'] == 'fetch']
+        if fetches:
+            st.markdown("**Page fetches**")
+            st.dataframe(
+                pd.DataFrame(fetches).reindex(columns=['url', 'status', 'bytes', 'from_cache', 'retries',
+                                                       'rate_wait_s', 'wall_s']),
+                use_container_width=True
+            )
+        
+        st.download_button(
+            "Download spans (JSON)",
+            json.dumps({'run_id': job.id, 'summary': summary, 'spans': job.spans}, indent=2, default=str),
+            file_name=f"spans-{job.id}.json",
+            mime="application/json"
+        )
+        st.caption(f"Prometheus metrics: {os.path.join(CACHE_DIR, 'metrics', 'metrics.prom')}")
+
+def render_job(job: ResearchJob, debug_mode: bool = False):
+    """Draw a research job's progress and whatever results it has so far"""
+    running = not job.finished
+    
+    st.progress(job.progress)
+    if job.status == 'queued':
+        position = get_job_manager().queue_position(job)
+        st.text(f"{job.stage} ({position} job(s) ahead)" if position else job.stage)
+    else:
+        st.text(job.stage)
+    
+    if debug_mode and len(job.log):
+        with st.expander("Scraping log", expanded=running):
+            st.text(job.log.text())
     
-    def analyze(self, startup_idea: str, funding_data: str) -> str:
-        return self.chain.run(startup_idea=startup_idea, funding_data=funding_data)
+    if debug_mode and job.spans:
+        render_spans(job)
+    
+    if job.status == 'error':
+        st.error(f"Error occurred: {job.error}")
+        st.error("Please try again or enable 'Use Sample Data' option.")
+        if debug_mode and job.traceback:
+            st.code(job.traceback)
+    elif job.status == 'interrupted':
+        st.warning("This research run was interrupted by an app restart. Please run it again.")
+    
+    if job.status == 'done' and 'market_analysis' not in job.results:
+        st.info(job.stage)
+        return
+    
+    reused = [name.replace('_', ' ') for name, state in job.results.get('stages', {}).items() if state == 'reused']
+    if reused:
+        st.caption(f"♻️ Inputs unchanged since an earlier run, reused: {', '.join(reused)}")
+    
+    articles = job.results.get('articles')
+    if not articles:
+        return
+    
+    st.success(f"Analyzing {len(articles)} funding articles")
+    
+    tab1, tab2, tab3, tab4 = st.tabs([
+        "Market Analysis", 
+        "Startup Ideas", 
+        "Competitive Analysis",
+        "Source Articles"
+    ])
+    
+    cursor = "▌" if running else ""
+    
+    with tab1:
+        st.markdown("### Market & Funding Analysis")
+        render_timing(job, 'market_analysis')
+        market_analysis = job.partial_text('market_analysis')
+        if market_analysis:
+            st.markdown(market_analysis + ("" if 'market_analysis' in job.results else cursor))
+        elif running:
+            st.caption("Waiting for the model...")
+    
+    with tab2:
+        st.markdown("### Generated Startup Ideas")
+        render_timing(job, 'startup_ideas')
+        startup_ideas = job.partial_text('startup_ideas')
+        if 'startup_ideas' in job.results:
+            st.markdown(startup_ideas)
+            st.download_button(
+                "Download Ideas",
+                startup_ideas,
+                file_name=f"startup_ideas_{datetime.now().strftime('%Y%m%d')}.txt",
+                mime="text/plain",
+                use_container_width=True
+            )
+            for item in job.results.get('idea_repeats', []):
+                repeat = item['repeat_of']
+                if repeat:
+                    st.caption(f"🔁 **{item['name']}** is close to \"{repeat['name']}\" "
+                               f"from {repeat['created_at'][:10]} (similarity {repeat['score']:.2f})")
+        elif startup_ideas:
+            st.markdown(startup_ideas + cursor)
+        elif running:
+            st.caption("Waiting for market analysis...")
+    
+    with tab3:
+        st.markdown("### Competitive Landscape Analysis")
+        for item in job.results.get('competition', []):
+            st.markdown(f"#### {item['name']}")
+            if item['analysis'] is not None:
+                st.markdown(item['analysis'])
+            else:
+                st.caption("Waiting for analysis...")
+    
+    with tab4:
+        st.markdown("### Source Articles")
+        render_articles(articles, key=f"articles_{job.id}")
 
-def format_articles_for_analysis(articles: List[Dict]) -> str:
-    """Format scraped articles for AI analysis"""
-    formatted_text = ""
-    for i, article in enumerate(articles, 1):
-        formatted_text += f"""
-ARTICLE {i}:
-Title: {article['title']}
-Source: {article['source']}
-Date: {article['date']}
-Link: {article['link']}
-Content: {article['excerpt']}
+def render_articles(articles: List[Dict], key: str, page_size: int = 50):
+    """Source articles as one table, a page at a time"""
+    pages = (len(articles) + page_size - 1) // page_size
+    page = 1
+    if pages > 1:
+        page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, key=key)
+    
+    rows = [
+        {
+            'title': article['title'],
+            'source': article['source'],
+            'date': article['date'],
+            'link': article['link'] if article['link'].startswith('http') else None,
+            'excerpt': article['excerpt'],
+        }
+        for article in articles[(page - 1) * page_size:page * page_size]
+    ]
+    st.dataframe(
+        rows,
+        column_config={
+            'title': st.column_config.TextColumn("Title", width="large"),
+            'source': "Source",
+            'date': "Date",
+            'link': st.column_config.LinkColumn("Link", display_text="View Article"),
+            'excerpt': st.column_config.TextColumn("Excerpt", width="large"),
+        },
+        hide_index=True,
+        use_container_width=True
+    )
 
----
-"""
-    return formatted_text
+@st.fragment(run_every=1.0)
+def poll_job(job_id: str, debug_mode: bool = False):
+    """Re-render a running job every second without rerunning the whole app"""
+    job = get_job_manager().get(job_id)
+    if job is None or job.finished:
+        # Full rerun so the rest of the page picks up the results
+        st.rerun()
+    render_job(job, debug_mode)
+
+def render_trends(trend_store: TrendStore):
+    """Funding by sector across all recorded runs, over a selectable window"""
+    st.header("Funding Trends")
+    weeks = st.radio("Window:", [4, 12, 52], index=1, horizontal=True,
+                     format_func=lambda weeks: f"{weeks} weeks")
+    sectors = trend_store.rollup('sector', weeks)
+    if not sectors:
+        st.info("Trends build up as research runs record funding events")
+        return
+    
+    st.dataframe(
+        [{'sector': entry['sector'], 'deals': entry['deals'], 'total': format_usd(entry['total_usd'])}
+         for entry in sectors],
+        hide_index=True,
+        use_container_width=True
+    )
+    weekly = pd.DataFrame.from_dict(trend_store.weekly('sector', weeks), orient='index').fillna(0) / 1e6
+    st.caption("Disclosed funding per week ($M)")
+    st.bar_chart(weekly)
+
+def session_article_index(articles: List[Dict]) -> ArticleIndex:
+    """ArticleIndex over the articles this session is showing, rebuilt only when they change"""
+    key = hashlib.sha256("\n".join(article['link'] for article in articles).encode('utf-8')).hexdigest()
+    cached = st.session_state.get('article_index')
+    if cached is None or cached[0] != key:
+        cached = st.session_state['article_index'] = (key, ArticleIndex().add_many(articles))
+    return cached[1]
+
+def render_stream(tokens: Iterator[str], refresh_interval: float = 0.1) -> str:
+    """Render streamed model output progressively and report time to first token"""
+    placeholder = st.empty()
+    caption = st.empty()
+    start = time.perf_counter()
+    first_token_at = None
+    last_render = 0.0
+    text = ""
+    
+    with st.spinner("Waiting for the model..."):
+        for token in tokens:
+            now = time.perf_counter()
+            if first_token_at is None:
+                first_token_at = now - start
+                caption.caption(f"First token after {first_token_at:.1f}s")
+            text += token
+            # Batch token updates so each one isn't its own websocket message
+            if now - last_render >= refresh_interval:
+                placeholder.markdown(text + "▌")
+                last_render = now
+    
+    placeholder.markdown(text)
+    if first_token_at is not None:
+        caption.caption(f"First token after {first_token_at:.1f}s · complete after {time.perf_counter() - start:.1f}s")
+    return text
 
 def main():
+    # Everything before main() - imports and definitions - counts as module load
+    main_start = time.perf_counter()
+    st.set_page_config(
+        page_title="Startup Idea Finder",
+        page_icon="💡",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+    
     st.title("💡 Startup Idea Finder & Funding Tracker")
     st.markdown("### Discover trending startup ideas based on real funding data")
     
     debug_mode = st.sidebar.checkbox("🐛 Debug Mode", help="Show detailed scraping information")
+    # Identifies this browser session to the LLM scheduler, which shares the model fairly between sessions
+    session_id = st.session_state.setdefault('session_id', uuid.uuid4().hex[:12])
     
     with st.sidebar:
         st.header("🔧 Configuration")
@@ -465,6 +3450,34 @@ def main():
             index=0
         )
         
+        map_choice = st.selectbox(
+            "Model for article summaries:",
+            ["Same as above"] + model_options,
+            help="Condensing large article sets is simple extraction; a small model such as phi3 does it faster"
+        )
+        map_model = None if map_choice in ("Same as above", selected_model) else map_choice
+        
+        context_tokens = st.select_slider(
+            "Model context window (tokens):",
+            options=[2048, 4096, 8192, 16384, 32768],
+            value=4096,
+            help="Larger article sets are summarized in chunks that fit this window"
+        )
+        
+        max_parallel = st.slider(
+            "Parallel model requests:",
+            min_value=1,
+            max_value=8,
+            value=min(OLLAMA_NUM_PARALLEL, 8),
+            help="Match the OLLAMA_NUM_PARALLEL setting of your Ollama server"
+        )
+        
+        bypass_llm_cache = st.checkbox(
+            "Regenerate AI Output (Bypass Cache)",
+            value=False,
+            help="Identical inputs normally reuse the previous answer from the model"
+        )
+        
         st.header("📊 Data Sources")
         
         use_sample_data = st.checkbox(
@@ -473,25 +3486,47 @@ def main():
             help="Use predefined sample data instead of web scraping"
         )
         
+        article_window = st.selectbox(
+            "Articles to analyze:",
+            ARTICLE_WINDOWS,
+            help="Scraped articles are remembered between runs; the incremental options stop scraping once known articles are reached"
+        )
+        
+        cache_minutes = st.number_input(
+            "Reuse downloaded pages for (minutes):",
+            min_value=0,
+            max_value=1440,
+            value=15,
+            help="Listing pages newer than this are served from the local cache; older ones are revalidated"
+        )
+        
         st.header("📊 Research Parameters")
         
         num_articles = st.slider(
             "Number of articles to analyze:",
             min_value=5,
-            max_value=25,
+            max_value=100,
             value=10,
             help="More articles = better analysis but slower processing"
         )
         
-        focus_areas = [
-            "All Sectors", "AI/Machine Learning", "Fintech", "Healthcare", 
-            "E-commerce", "SaaS/B2B", "Consumer Apps", "Climate Tech",
-            "EdTech", "PropTech", "Web3/Crypto", "Gaming", "IoT/Hardware"
-        ]
+        dedup_threshold = st.slider(
+            "Near-duplicate similarity threshold:",
+            min_value=0.1,
+            max_value=1.01,
+            value=DEDUP_THRESHOLD,
+            step=0.05,
+            help="Articles about the same story at or above this similarity are merged into one; the maximum disables merging"
+        )
+        
+        fetch_bodies = st.checkbox(
+            "📄 Fetch full article text",
+            help="Download each article page for richer analysis instead of using the listing excerpt only"
+        )
         
         focus_area = st.selectbox(
             "Focus Area:",
-            focus_areas,
+            FOCUS_AREAS,
             help="Focus analysis on specific sectors"
         )
         
@@ -515,16 +3550,29 @@ def main():
         - Competitive landscape
         """)
     
-    llm = get_llm(selected_model)
+    llm = get_llm(selected_model, context_tokens)
     if not llm:
         st.error("Failed to initialize language model. Please check Ollama setup.")
         st.stop()
     
+    # Load the models while the user is still reading the page
+    model_manager = get_model_manager()
+    for model in dict.fromkeys(filter(None, [selected_model, map_model])):
+        model_manager.preload(model, context_tokens)
+        status = model_manager.status(model, context_tokens)
+        if status['state'] == 'ready':
+            st.sidebar.caption(f"🟢 {model} loaded in {status['load_s']}s")
+        elif status['state'] == 'error':
+            st.sidebar.caption(f"🔴 {model} could not be loaded: {status['error']}")
+        else:
+            st.sidebar.caption(f"⏳ Loading {model}...")
+    
     try:
-        funding_analyzer = FundingAnalyzer(llm)
-        idea_generator = IdeaGenerator(llm)
-        competitor_analyzer = CompetitorAnalyzer(llm)
-        scraper = WebScraper()
+        funding_analyzer, idea_generator, competitor_analyzer = get_agents(
+            selected_model, context_tokens, max_parallel, bypass_llm_cache, map_model
+        )
+        article_store = get_article_store()
+        scraper = get_scraper(cache_minutes * 60, article_window != "Latest scrape")
         st.success(f"✅ AI agents initialized with {selected_model}")
     except Exception as e:
         st.error(f"Error initializing agents: {str(e)}")
@@ -535,134 +3583,47 @@ def main():
     with col1:
         st.header("Generate Startup Ideas")
         
+        job_manager = get_job_manager()
+        
         if st.button("🔍 Research & Generate Ideas", type="primary", use_container_width=True):
-            progress_bar = st.progress(0)
-            status_text = st.empty()
-            
-            try:
-                all_articles = []
-                
-                if use_sample_data:
-                    status_text.text("Using sample funding data...")
-                    progress_bar.progress(30)
-                    
-                    all_articles = scraper.get_sample_funding_data()
-                    st.success(f"Using {len(all_articles)} sample articles")
-                    
-                else:
-                    status_text.text("Scraping funding news from various sources...")
-                    progress_bar.progress(10)
-                    
-                    with st.spinner("Fetching latest funding news..."):
-                        if debug_mode:
-                            st.write("🔍 Starting TechCrunch scraping...")
-                        
-                        techcrunch_articles = scraper.scrape_techcrunch_funding(num_articles)
-                        time.sleep(2)  
-                        
-                        if debug_mode:
-                            st.write(f"TechCrunch results: {len(techcrunch_articles)} articles")
-                            st.write("🔍 Starting VentureBeat scraping...")
-                        
-                        venturebeat_articles = scraper.scrape_venture_beat_funding(min(num_articles//2, 5))
-                        
-                        if debug_mode:
-                            st.write(f"VentureBeat results: {len(venturebeat_articles)} articles")
-                        
-                        all_articles = techcrunch_articles + venturebeat_articles
-                    
-                    if not all_articles:
-                        st.warning("Web scraping didn't find articles. Using sample data instead.")
-                        all_articles = scraper.get_sample_funding_data()
-                
-                if not all_articles:
-                    st.error("No funding articles found even with sample data.")
-                    return
-                
-                st.success(f"Analyzing {len(all_articles)} funding articles")
-                
-                # Analyze funding trends
-                status_text.text("Analyzing funding trends and patterns...")
-                progress_bar.progress(40)
-                
-                formatted_articles = format_articles_for_analysis(all_articles)
-                
-                with st.spinner("Analyzing market trends..."):
-                    market_analysis = funding_analyzer.analyze(formatted_articles)
-                
-                # Generate startup ideas
-                status_text.text("Generating startup ideas...")
-                progress_bar.progress(70)
-                
-                focus_context = f"Focus on {focus_area}" if focus_area != "All Sectors" else ""
-                
-                with st.spinner("Creating innovative startup ideas..."):
-                    startup_ideas = idea_generator.generate(
-                        market_analysis, focus_context, additional_context
-                    )
-                
-                # Analyze idea's competition 
-                status_text.text("Analyzing competitive landscape...")
-                progress_bar.progress(90)
-                
-                with st.spinner("Analyzing competition..."):
-                    first_idea = startup_ideas.split("**IDEA NAME:**")[1].split("**SECTOR:**")[0] if "**IDEA NAME:**" in startup_ideas else "AI-powered business solution"
-                    competitive_analysis = competitor_analyzer.analyze(first_idea, formatted_articles)
-                
-                progress_bar.progress(100)
-                status_text.text("Analysis complete!")
-                
-                st.session_state['last_analysis_data'] = {
-                    'articles': all_articles,
-                    'market_analysis': market_analysis,
-                    'startup_ideas': startup_ideas,
-                    'competitive_analysis': competitive_analysis
-                }
-                
-                tab1, tab2, tab3, tab4 = st.tabs([
-                    "Market Analysis", 
-                    "Startup Ideas", 
-                    "Competitive Analysis",
-                    "Source Articles"
-                ])
-                
-                with tab1:
-                    st.markdown("### Market & Funding Analysis")
-                    st.markdown(market_analysis)
-                
-                with tab2:
-                    st.markdown("### Generated Startup Ideas")
-                    st.markdown(startup_ideas)
-                    
-                    st.download_button(
-                        "Download Ideas",
-                        startup_ideas,
-                        file_name=f"startup_ideas_{datetime.now().strftime('%Y%m%d')}.txt",
-                        mime="text/plain",
-                        use_container_width=True
-                    )
-                
-                with tab3:
-                    st.markdown("### Competitive Landscape Analysis")
-                    st.markdown(competitive_analysis)
-                
-                with tab4:
-                    st.markdown("### Source Articles")
-                    
-                    for article in all_articles:
-                        with st.expander(f"{article['title']} - {article['source']}"):
-                            st.write(f"**Date:** {article['date']}")
-                            if article['link'].startswith('http'):
-                                st.write(f"**Link:** [View Article]({article['link']})")
-                            else:
-                                st.write(f"**Link:** {article['link']}")
-                            st.write(f"**Excerpt:** {article['excerpt']}")
-                
-            except Exception as e:
-                st.error(f"Error occurred: {str(e)}")
-                st.error("Please try again or enable 'Use Sample Data' option.")
-                if debug_mode:
-                    st.exception(e)
+            job = job_manager.submit(
+                run_research_pipeline,
+                {
+                    'use_sample_data': use_sample_data,
+                    'num_articles': num_articles,
+                    'article_window': article_window,
+                    'dedup_threshold': dedup_threshold,
+                    'fetch_bodies': fetch_bodies,
+                    'scrape_ttl': cache_minutes * 60,
+                    'focus_area': focus_area,
+                    'additional_context': additional_context,
+                    'max_parallel': max_parallel,
+                    'session': session_id,
+                },
+                scraper=scraper,
+                article_store=article_store,
+                funding_analyzer=funding_analyzer,
+                idea_generator=idea_generator,
+                competitor_analyzer=competitor_analyzer,
+                idea_index=get_idea_index(),
+                trend_store=get_trend_store(),
+                stage_cache=get_stage_cache()
+            )
+            st.session_state['job_id'] = job.id
+            # Lets a reconnecting browser find the job again
+            st.query_params['job'] = job.id
+        
+        job_id = st.session_state.get('job_id') or st.query_params.get('job')
+        if job_id:
+            job = job_manager.get(job_id)
+            if job is None:
+                st.warning("That research run is no longer available.")
+            elif job.finished:
+                render_job(job, debug_mode)
+                if 'market_analysis' in job.results:
+                    st.session_state['last_analysis_data'] = job.results
+            else:
+                poll_job(job_id, debug_mode)
     
     with col2:
         st.header("Quick Stats")
@@ -670,9 +3631,25 @@ def main():
         if st.session_state.get('last_analysis_data'):
             data = st.session_state['last_analysis_data']
             
+            # Runs saved before funding extraction existed are summarized here instead
+            funding = data.get('funding') or summarize_funding(data.get('articles', []))
+            aggregates = funding['aggregates']
+            sectors = [entry for entry in aggregates['sectors'] if entry['sector'] != "Other"]
+            
             st.metric("Articles Analyzed", len(data.get('articles', [])))
-            st.metric("Ideas Generated", "5-7")
-            st.metric("Sectors Covered", "Multiple")
+            st.metric("Disclosed Funding", format_usd(aggregates['total_usd']),
+                      help=f"{aggregates['disclosed']} of {aggregates['deals']} deals state an amount")
+            # competition holds a placeholder idea when the generator's output couldn't be parsed
+            st.metric("Ideas Generated", len(parse_startup_ideas(data.get('startup_ideas', ""))))
+            st.metric("Sectors Covered", len(sectors))
+            
+            if sectors:
+                st.dataframe(
+                    [{'sector': entry['sector'], 'deals': entry['deals'], 'total': format_usd(entry['total_usd'])}
+                     for entry in sectors],
+                    hide_index=True,
+                    use_container_width=True
+                )
             
             articles = data.get('articles', [])
             if articles:
@@ -689,6 +3666,10 @@ def main():
         
         st.markdown("---")
         
+        render_trends(get_trend_store())
+        
+        st.markdown("---")
+        
         st.header("Custom Analysis")
         
         with st.expander("Analyze Specific Idea"):
@@ -701,18 +3682,224 @@ def main():
             if st.button("Analyze This Idea") and custom_idea:
                 if llm:
                     with st.spinner("Analyzing your idea..."):
-                        if st.session_state.get('last_analysis_data'):
-                            articles = st.session_state['last_analysis_data']['articles']
+                        data = st.session_state.get('last_analysis_data') or {}
+                        articles = data.get('articles') or scraper.get_sample_funding_data()
+                        article_index = session_article_index(articles)
+                        if data.get('article_context'):
+                            # The run's own article prefix, which Ollama still has cached
+                            funding_news = data['article_context']
+                            funding_table = data['funding']['table']
+                            relevant = CompetitorAnalyzer.relevant_articles(custom_idea, article_index,
+                                                                            article_context=funding_news)
                         else:
-                            articles = scraper.get_sample_funding_data()
-                        
-                        formatted_articles = format_articles_for_analysis(articles)
-                        analysis = competitor_analyzer.analyze(custom_idea, formatted_articles)
+                            funding_news = CompetitorAnalyzer.funding_context(custom_idea, article_index)
+                            funding_table = relevant = ""
                         
                         st.markdown("### Analysis Results")
-                        st.markdown(analysis)
+                        # Someone is watching this one, so it goes ahead of queued research jobs
+                        with use_requester(session_id, LLMScheduler.INTERACTIVE):
+                            try:
+                                render_stream(competitor_analyzer.analyze_stream(
+                                    custom_idea, funding_news, funding_table, relevant
+                                ))
+                            except RuntimeError as e:
+                                st.error(str(e))
+        
+        with st.expander("Similar Past Ideas"):
+            idea_index = get_idea_index()
+            query = st.text_input("Describe an idea:", placeholder="e.g., AI bookkeeping for freelancers")
+            if query:
+                start = time.perf_counter()
+                matches = idea_index.similar(query, k=10)
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                if matches:
+                    st.dataframe(
+                        [
+                            {'similarity': round(score, 3), 'name': record['name'],
+                             'sector': record.get('sector', ""), 'date': record['created_at'][:10]}
+                            for score, record in matches
+                        ],
+                        hide_index=True,
+                        use_container_width=True
+                    )
+                st.caption(f"Searched {len(idea_index)} past ideas in {elapsed_ms:.1f} ms")
+            
+            if len(idea_index):
+                st.write("**Past ideas by sector:**")
+                st.dataframe(idea_index.sector_clusters(), hide_index=True, use_container_width=True)
+            else:
+                st.info("Ideas from your research runs will appear here")
+    
+    if debug_mode:
+        now = time.perf_counter()
+        st.sidebar.caption(
+            f"⏱️ Module load {main_start - _MODULE_START:.3f}s · "
+            f"rerun {now - _MODULE_START:.3f}s"
+        )
+        queue = _llm_scheduler.stats()
+        st.sidebar.caption(
+            f"🧮 LLM requests: {queue['running']} running · {queue['waiting']} waiting · "
+            f"{queue['coalesced']} shared with an identical request"
+        )
         
     
 
+def slugify(text: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')
+
+def run_batch(args: argparse.Namespace) -> int:
+    """Headless pipeline: scrape and analyze once, then generate ideas for every focus area in parallel"""
+    def log(message: str):
+        print(message, file=sys.stderr, flush=True)
+    
+    if args.focus == ['all']:
+        focus_areas = FOCUS_AREAS
+    else:
+        unknown = [area for area in args.focus if area not in FOCUS_AREAS]
+        if unknown:
+            log(f"Unknown focus area(s): {', '.join(unknown)}. Choose from: {', '.join(FOCUS_AREAS)}")
+            return 2
+        focus_areas = args.focus
+    
+    llm = get_llm(args.model, args.context_tokens)
+    if not llm:
+        log(f"Failed to initialize Ollama model '{args.model}'.")
+        return 1
+    
+    stage_llms = {}
+    for stage in MODEL_STAGES:
+        model = getattr(args, f"{stage}_model")
+        if model and model != args.model:
+            stage_llms[stage] = get_llm(model, args.context_tokens)
+    for model in dict.fromkeys([args.model] + [llm.model for llm in stage_llms.values()]):
+        get_model_manager().preload(model, args.context_tokens)
+    
+    funding_analyzer, idea_generator, competitor_analyzer = create_agents(
+        llm, args.no_cache, args.context_tokens, args.parallel, stage_llms
+    )
+    article_store = ArticleStore(os.path.join(CACHE_DIR, "articles.db"))
+    scraper = WebScraper(store=article_store, incremental=args.window != "Latest scrape")
+    idea_index = IdeaIndex(os.path.join(CACHE_DIR, "ideas"), make_embedder())
+    
+    params = {
+        'use_sample_data': args.sample,
+        'num_articles': args.num_articles,
+        'article_window': args.window,
+        'dedup_threshold': args.dedup_threshold,
+        'fetch_bodies': args.full_text,
+    }
+    tracer = Tracer()
+    with use_tracer(tracer):
+        articles = gather_articles(params, scraper, article_store, log=log)
+    if not articles:
+        log("No new funding articles since the last run.")
+        return 0
+    
+    log(f"Analyzing funding trends across {len(articles)} articles...")
+    with use_tracer(tracer):
+        funding = summarize_funding(articles)
+        funding['table'] = record_trends(TrendStore(os.path.join(CACHE_DIR, "trends")), funding,
+                                         datetime.now().strftime('%Y%m%d-%H%M%S'), params, log=log)
+        article_context = funding_analyzer.article_context(
+            articles, on_progress=lambda done, total: log(f"Summarized article group {done}/{total}"),
+            funding_table=funding['table']
+        )
+        market_analysis = funding_analyzer.analyze(article_context, funding['table'])
+    article_index = ArticleIndex().add_many(articles)
+    
+    run_dir = os.path.join(args.output_dir, datetime.now().strftime('%Y%m%d-%H%M%S'))
+    os.makedirs(os.path.join(run_dir, "ideas"), exist_ok=True)
+    with open(os.path.join(run_dir, "market_analysis.md"), 'w', encoding='utf-8') as f:
+        f.write(f"# Market & Funding Analysis\n\n{market_analysis}\n")
+    
+    def ideas_for(focus_area: str) -> Dict:
+        startup_ideas = idea_generator.generate(market_analysis, focus_instruction(focus_area), args.context)
+        result = {'focus_area': focus_area, 'startup_ideas': startup_ideas}
+        ideas = parse_startup_ideas(startup_ideas)
+        result['idea_repeats'] = index_ideas(idea_index, ideas, log=log,
+                                             run_id=os.path.basename(run_dir), focus_area=focus_area)
+        if args.competition:
+            idea_texts = [idea['text'] for idea in ideas]
+            analyses = dict(competitor_analyzer.analyze_many(
+                idea_texts, article_context, args.parallel, funding['table'],
+                [CompetitorAnalyzer.relevant_articles(text, article_index, article_context=article_context)
+                 for text in idea_texts]
+            ))
+            result['competition'] = [
+                {'name': idea['name'], 'analysis': analyses[i]} for i, idea in enumerate(ideas)
+            ]
+        return result
+    
+    results = {}
+    failed = 0
+    with ThreadPoolExecutor(max_workers=max(1, args.parallel)) as executor:
+        with use_tracer(tracer):
+            futures = {submit_in_context(executor, ideas_for, area): area for area in focus_areas}
+        for future in as_completed(futures):
+            area = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                failed += 1
+                log(f"Idea generation failed for {area}: {str(e)}")
+                continue
+            
+            results[area] = result
+            markdown = f"# Startup Ideas: {area}\n\n{result['startup_ideas']}\n"
+            for item in result['idea_repeats']:
+                if item['repeat_of']:
+                    markdown += (f"\n> Repeat: {item['name']} is close to \"{item['repeat_of']['name']}\" "
+                                 f"from {item['repeat_of']['created_at'][:10]}\n")
+            for item in result.get('competition', []):
+                markdown += f"\n## Competitive Analysis: {item['name']}\n\n{item['analysis']}\n"
+            with open(os.path.join(run_dir, "ideas", f"{slugify(area)}.md"), 'w', encoding='utf-8') as f:
+                f.write(markdown)
+            log(f"Wrote ideas for {area} ({len(results)}/{len(focus_areas)})")
+    
+    with open(os.path.join(run_dir, "results.json"), 'w', encoding='utf-8') as f:
+        json.dump({
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'model': args.model,
+            'articles': articles,
+            'funding': funding,
+            'market_analysis': market_analysis,
+            'ideas': [results[area] for area in focus_areas if area in results],
+        }, f, indent=2)
+    
+    tracer.write_json(os.path.join(run_dir, "spans.json"), model=args.model)
+    export_run_metrics(tracer, os.path.basename(run_dir))
+    get_metrics().write(os.path.join(run_dir, "metrics.prom"))
+    
+    log(f"Results written to {run_dir}")
+    return 1 if failed else 0
+
+def cli(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(prog="python main.py", description="Startup Idea Finder without the Streamlit UI")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    run = subparsers.add_parser("run", help="scrape, analyze and generate ideas into JSON/Markdown files")
+    run.add_argument("--focus", nargs="+", default=["all"],
+                     help="focus areas to generate ideas for, or 'all' (default)")
+    run.add_argument("--model", default="llama3.2", help="Ollama model (default: llama3.2)")
+    for stage in MODEL_STAGES:
+        run.add_argument(f"--{stage}-model", help=f"Ollama model for the {stage} stage (default: --model)")
+    run.add_argument("--num-articles", type=int, default=10)
+    run.add_argument("--window", choices=ARTICLE_WINDOWS, default="Latest scrape",
+                     help="which stored articles to analyze")
+    run.add_argument("--sample", action="store_true", help="use sample data instead of scraping")
+    run.add_argument("--context", default="", help="additional context for the idea generator")
+    run.add_argument("--competition", action="store_true", help="also analyze competition for every idea")
+    run.add_argument("--parallel", type=int, default=OLLAMA_NUM_PARALLEL, help="parallel model requests")
+    run.add_argument("--context-tokens", type=int, default=4096, help="model context window")
+    run.add_argument("--dedup-threshold", type=float, default=DEDUP_THRESHOLD)
+    run.add_argument("--full-text", action="store_true", help="fetch each article page instead of using listing excerpts")
+    run.add_argument("--no-cache", action="store_true", help="regenerate instead of reusing cached model output")
+    run.add_argument("--output-dir", default="output")
+    
+    args = parser.parse_args(argv)
+    return run_batch(args)
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "run":
+        sys.exit(cli(sys.argv[1:]))
     main()
@@ -0,0 +1,52 @@
+import http.server
+import os
+import socketserver
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def listing(titles, prefix: str = "") -> bytes:
+    """TechCrunch-shaped listing page with one article card per title"""
+    cards = "".join(
+        f'<article class="post-block"><h2><a href="/2024/01/{prefix}{i}">{title}</a></h2>'
+        f'<p>{title}. More details inside.</p></article>'
+        for i, title in enumerate(titles)
+    )
+    return f"<html><body><main>{cards}</main></body></html>".encode()
+
+@pytest.fixture
+def serve():
+    """Serve {path: (body, delay)} on localhost and return the base URL"""
+    servers = []
+    
+    def start(pages):
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                body, delay = pages.get(self.path, (None, 0))
+                time.sleep(delay)
+                if body is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, *args):
+                pass
+        
+        server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+    
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,36 @@
+from main import (ARTICLE_GROUP_HEADER, ArticleIndex, CompetitorAnalyzer, FundingAnalyzer, estimate_tokens,
+                  format_articles_for_analysis)
+
+def corpus(n: int = 60):
+    sectors = ["payments", "robotics", "biotech", "logistics", "climate", "security"]
+    return [
+        {'title': f"Company{i} raises ${i + 5}M for {sectors[i % 6]}",
+         'link': f"https://example.com/2024/{i}",
+         'excerpt': f"Company{i} builds {sectors[i % 6]} software for mid-sized businesses. " * 3,
+         'date': "2024-01-01", 'source': "TechCrunch"}
+        for i in range(n)
+    ]
+
+IDEA = "Robotics platform for warehouse automation"
+
+def test_relevant_articles_names_numbered_articles():
+    articles = corpus()
+    index = ArticleIndex().add_many(articles)
+    
+    listing = CompetitorAnalyzer.relevant_articles(IDEA, index, article_context=format_articles_for_analysis(articles))
+    
+    assert listing.count("- ARTICLE ") == CompetitorAnalyzer.TOP_K
+    assert "robotics" in listing
+
+def test_relevant_articles_carries_excerpts_when_context_is_condensed():
+    index = ArticleIndex().add_many(corpus())
+    condensed = "".join(f"\n{ARTICLE_GROUP_HEADER} {i}:\n- Company | unknown | robots | link\n\n---\n"
+                        for i in range(1, 4))
+    
+    listing = CompetitorAnalyzer.relevant_articles(IDEA, index, article_context=condensed)
+    
+    assert "ARTICLE " not in listing
+    assert "https://example.com/2024/" in listing
+    assert "builds robotics software" in listing
+    budget = FundingAnalyzer.TASK_RESERVE - estimate_tokens(CompetitorAnalyzer.TASK_TEMPLATE) - estimate_tokens(IDEA)
+    assert estimate_tokens(listing) <= budget
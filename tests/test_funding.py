@@ -0,0 +1,31 @@
+from main import extract_funding_events, summarize_funding
+
+def article(title, excerpt=""):
+    return {'title': title, 'excerpt': excerpt, 'link': f"https://example.com/{abs(hash(title))}",
+            'date': "2024-01-01", 'source': "TechCrunch"}
+
+def test_excerpt_valuation_and_revenue_are_not_round_sizes():
+    events = extract_funding_events([
+        article("Acme raises new funding to expand to Europe",
+                "Acme was valued at $2 billion last year. It now makes $40 million in annual revenue."),
+    ])
+    
+    assert events['amount_usd'].isna().all()
+
+def test_amount_comes_from_excerpt_sentence_about_the_raise():
+    events = extract_funding_events([
+        article("Acme closes Series B",
+                "Acme reached $40 million in revenue. The Series B of $25 million was led by Sequoia."),
+    ])
+    
+    assert events['amount_usd'].tolist() == [25e6]
+
+def test_only_deals_are_counted():
+    funding = summarize_funding([
+        article("Acme raises $25M Series B for payroll software"),
+        article("Why investors are cooling on AI startups", "Funding fell 20 million short of forecasts."),
+    ])
+    
+    assert funding['aggregates']['deals'] == 1
+    assert funding['aggregates']['total_usd'] == 25e6
+    assert [event['title'] for event in funding['events']] == ["Acme raises $25M Series B for payroll software"]
@@ -0,0 +1,57 @@
+import threading
+import time
+
+from main import LLMScheduler
+
+class EchoLLM:
+    model = "echo"
+    
+    def __init__(self):
+        self.calls = 0
+        self.release = threading.Event()
+        self.release.set()
+    
+    def stream(self, prompt, config=None):
+        self.calls += 1
+        self.release.wait(5)
+        yield from prompt.split()
+
+def read_in_thread(iterator):
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(text=list(iterator)), daemon=True)
+    thread.start()
+    thread.join(5)
+    return result.get('text')
+
+def test_unread_stream_does_not_block_identical_requests():
+    scheduler = LLMScheduler(slots=1)
+    llm = EchoLLM()
+    
+    unread = scheduler.stream(llm, "a b c")
+    
+    assert read_in_thread(scheduler.stream(llm, "a b c")) == ["a", "b", "c"]
+    assert scheduler.stats()['in_flight'] == 0
+    unread.close()
+
+def test_identical_requests_in_flight_share_one_generation():
+    scheduler = LLMScheduler(slots=2)
+    llm = EchoLLM()
+    llm.release.clear()
+    
+    leader = scheduler.stream(llm, "a b c")
+    results = []
+    thread = threading.Thread(target=lambda: results.append(list(leader)), daemon=True)
+    thread.start()
+    while not scheduler.stats()['in_flight']:
+        time.sleep(0.01)
+    follower = scheduler.stream(llm, "a b c")
+    follower_thread = threading.Thread(target=lambda: results.append(list(follower)), daemon=True)
+    follower_thread.start()
+    while not scheduler.stats()['coalesced']:
+        time.sleep(0.01)
+    llm.release.set()
+    thread.join(5)
+    follower_thread.join(5)
+    
+    assert results == [["a", "b", "c"]] * 2
+    assert llm.calls == 1
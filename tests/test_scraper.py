@@ -0,0 +1,36 @@
+import os
+
+from conftest import listing
+from main import ArticleStore, WebScraper
+
+def scraper_for(base, paths, tmp_path, **kwargs):
+    store = ArticleStore(os.path.join(tmp_path, "articles.db"))
+    scraper = WebScraper(use_cache=False, store=store, sources={'TechCrunch': [base + path for path in paths]},
+                         requests_per_second=None, **kwargs)
+    return scraper, store
+
+def test_incremental_scrape_continues_past_a_caught_up_listing(serve, tmp_path):
+    stale = [f"Stale{i} raises $10M Series A" for i in range(5)]
+    fresh = [f"Fresh{i} raises $20M Series B" for i in range(10)]
+    base = serve({'/home': (listing(stale, "home"), 0), '/startups': (listing(fresh, "startups"), 0.3)})
+    
+    earlier, store = scraper_for(base, ['/home'], tmp_path)
+    earlier.scrape_sources({'TechCrunch': 5}, log=lambda message: None)
+    scraper = WebScraper(use_cache=False, store=store, incremental=True, requests_per_second=None,
+                         sources={'TechCrunch': [base + '/startups', base + '/home']})
+    
+    articles = scraper.scrape_sources({'TechCrunch': 10}, log=lambda message: None)['TechCrunch']
+    
+    assert [article['title'] for article in articles] == fresh
+
+def test_scrape_merges_listings_in_configured_order(serve, tmp_path):
+    first = [f"First{i} raises $10M Series A" for i in range(4)]
+    fallback = [f"Fallback{i} raises $20M Series B" for i in range(4)]
+    # The fallback answers first; the configured order still wins
+    base = serve({'/first': (listing(first, "first"), 0.3), '/fallback': (listing(fallback, "fallback"), 0)})
+    scraper, _ = scraper_for(base, ['/first', '/fallback'], tmp_path)
+    
+    runs = [[article['title'] for article in scraper.scrape_sources({'TechCrunch': 6})['TechCrunch']]
+            for _ in range(2)]
+    
+    assert runs[0] == runs[1] == first + fallback[:2]